@@ -0,0 +1,116 @@
+""" Interface for doing a single run of a bouncing ball without the hybrid solver. Between
+    bounces a ball is just constant acceleration, so every arc has a closed form solution
+    and we can jump straight from one bounce to the next.
+"""
+import math
+from typing import Dict
+import numpy as np
+from hybrid_models.hybrid_simulation import HybridSim
+from hybrid_models.hybrid_point import HybridPoint
+from hybrid_models.hybrid_result import HybridResult
+from .ball_state import BallState
+from .ball_params import DEFAULT_BALL_PARAMS
+from .reachability.ball_model import ForwardBallModel
+from .feasibility.ball_model import BackwardBallModel
+
+
+class AnalyticBallSim(HybridSim):
+    """Class to manage analytic bouncing ball runs. Works forwards or backwards in time,
+       using the matching hybrid model to hold onto start state, params and limits.
+    Attributes:
+        model (ForwardBallModel | BackwardBallModel): model for the direction we're going in
+        backwards (bool): if we're going backwards in time
+        step_time (float): how far apart each sample of an arc is
+    """
+    backwards: bool
+    step_time: float
+
+    def __init__(self, t_max: float, j_max: int, start_params: Dict, backwards: bool = False, step_time: float = 0.01):
+        """set up everything required for a sim run.
+        Args:
+            t_max (float): see class attribute of the same name
+            j_max (int): see class attribute of the same name
+            start_params (Dict): the starting parameters for a bouncing ball
+            backwards (bool): see class attribute of the same name
+            step_time (float): see class attribute of the same name. Defaults to the solver's max step
+        """
+        model_type = BackwardBallModel if backwards else ForwardBallModel
+        self.model = model_type(
+            BallState.from_properties(**start_params),
+            DEFAULT_BALL_PARAMS,
+            t_max,
+            j_max
+        )
+        self.t_max = t_max
+        self.j_max = j_max
+        self.backwards = backwards
+        self.step_time = step_time
+
+    def single_run(self) -> HybridResult:
+        """Perform a single run
+        Returns:
+            HybridResult: the result of this simulation, sampled every step_time along each arc
+                          plus the exact bounce points
+        """
+        gamma = self.model.system_params.gamma
+        restitution_coef = self.model.system_params.restitution_coef
+        # forwards, y' = v and v' = -gamma. Backwards, both flip sign
+        direction = -1.0 if self.backwards else 1.0
+        y_pos = float(self.model.start_state.y_pos)
+        y_vel = float(self.model.start_state.y_vel)
+
+        def should_bounce(y_pos: float, y_vel: float) -> bool:
+            return y_pos <= 0 and direction * y_vel < 0
+
+        def bounce(y_vel: float) -> float:
+            return y_vel / -restitution_coef if self.backwards else -restitution_coef * y_vel
+
+        time = 0.0
+        jumps = 0
+        # start states that are already bouncing bounce right away, same as the solver
+        while jumps < self.j_max and should_bounce(y_pos, y_vel):
+            y_vel = bounce(y_vel)
+            jumps += 1
+
+        arc_times = []
+        arc_states = []
+        arc_jumps = []
+        while jumps < self.j_max and time < self.t_max:
+            # y(t) = y_pos + direction * y_vel * t - gamma * t^2 / 2 hits the ground at the larger root
+            discriminant = max(y_vel * y_vel + 2 * gamma * y_pos, 0.0)
+            time_to_bounce = (direction * y_vel + math.sqrt(discriminant)) / gamma
+            arc_length = min(time_to_bounce, self.t_max - time)
+
+            local_times = np.append(np.arange(0.0, arc_length, self.step_time), arc_length)
+            y_positions = y_pos + direction * y_vel * local_times - 0.5 * gamma * local_times ** 2
+            y_velocities = y_vel - direction * gamma * local_times
+            arc_times.append(time + local_times)
+            arc_states.append(np.column_stack((y_positions, y_velocities)))
+            arc_jumps.append(np.full(local_times.size, jumps))
+
+            time += arc_length
+            if arc_length < time_to_bounce:
+                # ran out of time mid-arc
+                break
+            y_pos = 0.0
+            y_vel = bounce(y_velocities[-1])
+            jumps += 1
+
+        if not arc_times:
+            return HybridResult(True, None, [])
+
+        times = np.concatenate(arc_times)
+        states = np.concatenate(arc_states)
+        all_jumps = np.concatenate(arc_jumps)
+        if self.backwards:
+            # same remap as the solver based backwards run: points stay in order, but
+            # time and jumps get counted from the other end
+            times = times[-1] - times
+            all_jumps = all_jumps[-1] - all_jumps
+
+        solution = [
+            HybridPoint(point_time, BallState(point_state), point_jumps)
+            for point_time, point_state, point_jumps in zip(times.tolist(), states, all_jumps.tolist())
+        ]
+        # bouncing balls don't fail, they just run out of time or bounces
+        return HybridResult(True, None, solution)
@@ -2,7 +2,7 @@
 """
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BallParams():
     """Constant parameters for a bouncing ball. These values never
        change over the course of a simulation run.
@@ -12,3 +12,6 @@ class BallParams():
     """
     gamma: float
     restitution_coef: float
+
+# everything in the repo simulates the same ball. Frozen, so it's safe to share one copy
+DEFAULT_BALL_PARAMS = BallParams(gamma=9.81, restitution_coef=0.5)
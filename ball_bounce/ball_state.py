@@ -1,5 +1,7 @@
 """A bouncing ball state! As a list serializable class
 """
+from numpy import array, float64
+from numpy.typing import ArrayLike
 from hybrid_models.ndarray_dataclass import NDArrayBacked
 from collections.abc import Sequence
 
@@ -10,6 +12,17 @@ class BallState(NDArrayBacked[float]):
         y_pos (float): y position
         y_vel (float): y velocity
     """
+    __slots__ = ()
+
+    def __init__(self, data:ArrayLike):
+        # always a 2 slot float64 array, whatever we got handed (json can give us ints)
+        # NOTE: stays an ndarray rather than array.array('d'). solve_ivp and the kernels want
+        #       ndarrays, and to_array() hands this out without a copy. It already speaks the
+        #       buffer protocol too, so memoryview(state.to_array()) is zero-copy if you need it
+        self._data = array(data, dtype=float64)
+
+    def __len__(self) -> int:
+        return 2
 
     @property
     def y_pos(self) -> float:
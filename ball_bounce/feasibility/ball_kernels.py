@@ -0,0 +1,26 @@
+""" Arithmetic kernels for the backwards-in-time bouncing ball. These get called once per
+    integrator substep, so they're plain float in, float out functions that Numba can compile.
+    Signatures are spelled out so Numba compiles (or loads from its cache) at import, rather
+    than stalling the first solver call.
+"""
+from typing import Tuple
+from hybrid_models.jit import njit
+
+
+@njit("UniTuple(float64, 2)(float64, float64)", cache=True, fastmath=True)
+def flow_kernel(y_vel: float, gamma: float) -> Tuple[float, float]:
+    """d[y_pos]/dt and d[y_vel]/dt going backwards in time"""
+    return -y_vel, gamma
+
+@njit("float64(float64, float64)", cache=True, fastmath=True)
+def jump_kernel(y_vel: float, neg_inv_restitution_coef: float) -> float:
+    """y_vel before a bounce, given y_vel after it. Takes -1 / restitution_coef
+       so a bounce is a multiply rather than a divide"""
+    return y_vel * neg_inv_restitution_coef
+
+@njit("int64(float64, float64)", cache=True, fastmath=True)
+def jump_check_kernel(y_pos: float, y_vel: float) -> int:
+    """1 if we're at the ground and (backwards) heading into it, 0 otherwise"""
+    if y_pos <= 0 and y_vel > 0:
+        return 1
+    return 0
@@ -1,11 +1,14 @@
 """ Hybrid model for a bouncing ball
 """
 from typing import List, Tuple
+from numpy import ndarray
 from hybrid_models.hybrid_model import HybridModel
+from hybrid_models.jit import pick_backend
 from hybrid_models.hybrid_point import HybridPoint
 from input.input_signal import InputSignal
 from ..ball_state import BallState
 from ..ball_params import BallParams
+from .ball_kernels import flow_kernel, jump_kernel, jump_check_kernel
 
 
 class BackwardBallModel(HybridModel[BallState, BallParams]):
@@ -30,27 +33,37 @@ class BackwardBallModel(HybridModel[BallState, BallParams]):
         system_params: BallParams,
         t_max: float = 2.0,
         j_max: int = 8,
+        backend: str = "numba",
     ):
-        """Constructor"""
+        """Constructor. backend picks compiled (numba) or plain python kernels"""
         super().__init__()
         self.j_max = j_max
         self.t_max = t_max
         self.start_state = start_state
         self.system_params = system_params
         self.state_factory = BallState
+        # params are constant, so pull out what the hot path needs as plain floats once
+        self._gamma = float(system_params.gamma)
+        self._neg_inv_r = -1.0 / system_params.restitution_coef
+        self._flow_kernel = pick_backend(flow_kernel, backend)
+        self._jump_kernel = pick_backend(jump_kernel, backend)
+        self._jump_check_kernel = pick_backend(jump_check_kernel, backend)
 
-    def flow(self, hybrid_state: HybridPoint[BallState]) -> BallState:
+    def flow(self, hybrid_state: HybridPoint[BallState]) -> ndarray:
         """Flow function! This should take in y and return dy/dt, for going backwards in time
         Args:
             hybrid_state: (HybridPoint[BallState]): flappy's current state, along with
                                                       the current time and number of jumps
         Returns:
-            BallState: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
+            ndarray: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
         """
-        state = hybrid_state.state
-        state.y_pos = -state.y_vel
-        state.y_vel = self.system_params.gamma
-        return state
+        # NOTE: d[state]/dt gets written straight over the state we were handed-- y_pos
+        #       becoming a velocity isn't a bug, the solver gives us a fresh scratch copy every
+        #       call and takes the array as-is. Don't swap this for one buffer that's
+        #       reused between calls: solve_ivp holds onto the last derivative we hand it.
+        data = hybrid_state.state.to_array()
+        data[0], data[1] = self._flow_kernel(data[1], self._gamma)
+        return data
 
     def jump(self, hybrid_state: HybridPoint[BallState]) -> BallState:
         """Jump function! This should return a new state before a jump (going backwards in time),
@@ -62,7 +75,7 @@ class BackwardBallModel(HybridModel[BallState, BallParams]):
             FlappyState: new state after the jump!
         """
         state = hybrid_state.state
-        state.y_vel = state.y_vel / -self.system_params.restitution_coef
+        state.y_vel = self._jump_kernel(state.y_vel, self._neg_inv_r)
         return state
 
     def flow_check(self, hybrid_state: HybridPoint[BallState]) -> Tuple[int, bool]:
@@ -90,7 +103,4 @@ class BackwardBallModel(HybridModel[BallState, BallParams]):
                       false means keep going
         """
         state = hybrid_state.state
-        if state.y_pos <= 0 and state.y_vel > 0:
-            return (1, False)
-        else:
-            return (0, False)
\ No newline at end of file
+        return (self._jump_check_kernel(state.y_pos, state.y_vel), False)
\ No newline at end of file
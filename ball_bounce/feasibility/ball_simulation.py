@@ -1,33 +1,33 @@
 """ Interface for doing a single shot run of a bouncing ball simulation
 """
-from copy import deepcopy
 from typing import Dict
 from hybrid_models.hybrid_simulation import HybridSim
+from hybrid_models.hybrid_point import reverse_time_and_jumps
 from ..ball_state import BallState
-from ..ball_params import BallParams
+from ..ball_params import DEFAULT_BALL_PARAMS
 from .ball_model import BackwardBallModel
 from hybrid_models.hybrid_solver import HyEQSolver
 from hybrid_models.hybrid_result import HybridResult
-from pprint import pprint, pformat
-#from viztracer import VizTracer
 
 class FeasibilityBallSim(HybridSim[BackwardBallModel]):
     """Class to manage simulation runs, and an interface to Do The Thing. This is for backwards
         in-time-feasibility runs
     """
 
-    def __init__(self, t_max: float, j_max:int, start_params:Dict):
+    def __init__(self, t_max: float, j_max:int, start_params:Dict, backend: str = "numba"):
         """set up everything required for a sim run.
         Args:
             t_max (float): see class attribute of the same name
             j_max (int): see class attribute of the same name
             start_params (Dict): the starting parameters for a bouncing ball
+            backend (str): numba for compiled model kernels, python for the plain functions
         """
         self.model = BackwardBallModel(
             BallState.from_properties(**start_params),
-            BallParams(gamma=9.81, restitution_coef=0.5),
+            DEFAULT_BALL_PARAMS,
             t_max,
-            j_max
+            j_max,
+            backend
         )
 
     def single_run(self) -> HybridResult:
@@ -40,13 +40,6 @@ class FeasibilityBallSim(HybridSim[BackwardBallModel]):
         
         # ok, so our hybrid result is in the correct direction, but the times are gonna be
         # backwards, so we remap them.
-        max_solve_time = max([point.time for point in solution])
-        max_solve_jumps = max([point.jumps for point in solution])
-        for idx, new_time, new_jumps in zip(
-                [i for i in range(0, len(solution))],
-                [abs(max_solve_time - point.time) for point in solution],
-                [abs(max_solve_jumps - point.jumps) for point in solution]):
-            solution[idx].time = new_time
-            solution[idx].jumps = new_jumps
+        reverse_time_and_jumps(solution)
 
         return HybridResult(not solver.stop, None, solution)
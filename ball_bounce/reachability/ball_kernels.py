@@ -0,0 +1,25 @@
+""" Arithmetic kernels for the bouncing ball. These get called once per integrator substep,
+    so they're plain float in, float out functions that Numba can compile. Signatures are
+    spelled out so Numba compiles (or loads from its cache) at import, rather than stalling
+    the first solver call.
+"""
+from typing import Tuple
+from hybrid_models.jit import njit
+
+
+@njit("UniTuple(float64, 2)(float64, float64)", cache=True, fastmath=True)
+def flow_kernel(y_vel: float, neg_gamma: float) -> Tuple[float, float]:
+    """d[y_pos]/dt and d[y_vel]/dt. Takes -gamma, since gravity pulls y_vel down"""
+    return y_vel, neg_gamma
+
+@njit("float64(float64, float64)", cache=True, fastmath=True)
+def jump_kernel(y_vel: float, neg_restitution_coef: float) -> float:
+    """y_vel after a bounce. Takes -restitution_coef"""
+    return neg_restitution_coef * y_vel
+
+@njit("int64(float64, float64)", cache=True, fastmath=True)
+def jump_check_kernel(y_pos: float, y_vel: float) -> int:
+    """1 if we're at the ground and heading into it, 0 otherwise"""
+    if y_pos <= 0 and y_vel < 0:
+        return 1
+    return 0
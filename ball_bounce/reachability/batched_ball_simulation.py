@@ -0,0 +1,142 @@
+""" Interface for running a whole batch of bouncing balls at once. Instead of one model and
+    one solver run per start state, every ball is a row in one (n_balls, 2) array and all
+    of them get stepped together.
+"""
+from typing import Dict, List
+import numpy as np
+from hybrid_models.jit import njit, prange
+from hybrid_models.hybrid_point import HybridPoint
+from hybrid_models.hybrid_result import HybridResult
+from ..ball_state import BallState
+from ..ball_params import BallParams, DEFAULT_BALL_PARAMS
+
+
+@njit(cache=True, parallel=True)
+def flow_kernel(states, active, steps_taken, dt, gamma):
+    """Flow every active ball forward by dt. Gravity is constant, so this is the exact
+       solution over the step rather than an integrator approximation.
+    Args:
+        states (ndarray): (n_balls, 2) array of y_pos, y_vel. Updated in place
+        active (ndarray): (n_balls,) bool array, inactive balls are left alone
+        steps_taken (ndarray): (n_balls,) count of flow steps each ball has taken. Updated in place
+        dt (float): step size
+        gamma (float): acceleration due to gravity
+    """
+    for idx in prange(states.shape[0]):
+        if not active[idx]:
+            continue
+        y_pos = states[idx, 0]
+        y_vel = states[idx, 1]
+        states[idx, 0] = y_pos + y_vel * dt - 0.5 * gamma * dt * dt
+        states[idx, 1] = y_vel - gamma * dt
+        steps_taken[idx] += 1
+
+@njit(cache=True, parallel=True)
+def jump_kernel(states, active, jumps, restitution_coef, j_max):
+    """Bounce every active ball that's at the ground and heading into it, as long as it has
+       bounces left. Balls that hit j_max bounces stop being active, same as the solver.
+    Args:
+        states (ndarray): (n_balls, 2) array of y_pos, y_vel. Updated in place
+        active (ndarray): (n_balls,) bool array. Updated in place
+        jumps (ndarray): (n_balls,) jump counts. Updated in place
+        restitution_coef (float): energy lost in a bounce
+        j_max (int): max number of jumps to simulate out to
+    """
+    for idx in prange(states.shape[0]):
+        if active[idx] and jumps[idx] < j_max and states[idx, 0] <= 0 and states[idx, 1] < 0:
+            states[idx, 1] = -restitution_coef * states[idx, 1]
+            jumps[idx] += 1
+            if jumps[idx] >= j_max:
+                active[idx] = False
+
+
+class BatchedForwardBallSim:
+    """Class to manage a batch of bouncing ball runs that all share the same parameters.
+       Unlike ReachabilityBallSim this doesn't go through HyEQSolver: it takes fixed
+       steps of step_time, so a bounce is caught at the first step at or under the ground
+       rather than at the exact crossing.
+    Attributes:
+        t_max (float): max time for a sim run
+        j_max (int): max number of jumps for a sim run
+        step_time (float): fixed step size. The last step gets cut short so runs stop at t_max
+        states (ndarray): (n_balls, 2) start states, one y_pos, y_vel row per ball
+        system_params (BallParams): constants for simulating a bouncing ball
+    """
+    t_max: float
+    j_max: int
+    step_time: float
+    states: np.ndarray
+    system_params: BallParams
+
+    def __init__(self, t_max: float, j_max: int, start_states: List[Dict], step_time: float = 0.01):
+        """set up everything required for a batch of sim runs.
+        Args:
+            t_max (float): see class attribute of the same name
+            j_max (int): see class attribute of the same name
+            start_states (List[Dict]): the starting parameters for each bouncing ball
+            step_time (float): see class attribute of the same name
+        """
+        self.t_max = t_max
+        self.j_max = j_max
+        self.step_time = step_time
+        self.states = np.array(
+            [[start_state["y_pos"], start_state["y_vel"]] for start_state in start_states],
+            dtype=np.float64
+        )
+        self.system_params = DEFAULT_BALL_PARAMS
+
+    def single_run(self) -> HybridResult:
+        """Simulate the batch, and hand back the first ball's run. For batches of one, like the
+           CLI's --fixed-step runs
+        Returns:
+            HybridResult: the result for the first start state
+        """
+        return self.run()[0]
+
+    def run(self) -> List[HybridResult]:
+        """Simulate every ball in the batch
+        Returns:
+            List[HybridResult]: one result per start state, in the same order
+        """
+        gamma = self.system_params.gamma
+        restitution_coef = self.system_params.restitution_coef
+        # rounded first, so t_max = 0.7, step_time = 0.1 doesn't turn into 8 steps with a ~1e-16 last one
+        n_steps = int(np.ceil(round(self.t_max / self.step_time, 9)))
+        # every step is step_time, except the last one gets cut short to stop right at t_max
+        last_step_time = self.t_max - (n_steps - 1) * self.step_time
+        n_balls = self.states.shape[0]
+
+        states = self.states.copy()
+        # the solver doesn't flow or jump at all once it's at j_max, and with j_max = 0 that's from the start
+        active = np.full(n_balls, self.j_max > 0, dtype=np.bool_)
+        jumps = np.zeros(n_balls, dtype=np.int64)
+        steps_taken = np.zeros(n_balls, dtype=np.int64)
+        trajectory = np.empty((n_steps + 1, n_balls, 2), dtype=np.float64)
+        trajectory_jumps = np.empty((n_steps + 1, n_balls), dtype=np.int64)
+
+        # start states that are already bouncing bounce right away, same as the solver
+        jump_kernel(states, active, jumps, restitution_coef, self.j_max)
+        trajectory[0] = states
+        trajectory_jumps[0] = jumps
+        for step in range(1, n_steps + 1):
+            dt = self.step_time if step < n_steps else last_step_time
+            flow_kernel(states, active, steps_taken, dt, gamma)
+            # record before jumping, the solver also records the pre-jump side of a bounce
+            trajectory[step] = states
+            trajectory_jumps[step] = jumps
+            jump_kernel(states, active, jumps, restitution_coef, self.j_max)
+            if not active.any():
+                break
+
+        times = np.arange(n_steps + 1) * self.step_time
+        times[-1] = self.t_max
+        results = []
+        for ball_idx in range(n_balls):
+            last_step = steps_taken[ball_idx]
+            solution = [
+                HybridPoint(float(times[step]), BallState(trajectory[step, ball_idx]), int(trajectory_jumps[step, ball_idx]))
+                for step in range(last_step + 1)
+            ]
+            # bouncing balls don't fail, they just run out of time or bounces
+            results.append(HybridResult(True, None, solution))
+        return results
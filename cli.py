@@ -1,15 +1,94 @@
 """Run our prototypes as part of a cli!
 """
 import argparse
-import random
-import json
+import functools
+import os
+import secrets
 from pathlib import Path
-from flappy.reachability.flappy_simulation import ReachabilityFlappySim
-from flappy.feasibility.flappy_simulation import FeasibilityFlappySim
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+# orjson is optional, it's just a faster json.loads
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+# NOTE: the sims and HybridResultPlotter get imported inside the handlers that use them.
+#       Between scipy, matplotlib and numba they're slow to import, and --help (or a ball
+#       run) shouldn't have to pay for everything
+if TYPE_CHECKING:
+    import numpy as np
+    from hybrid_models.hybrid_result import HybridResult
+    from flappy.flappy_level import FlappyLevel
+    from flappy.reachability.flappy_simulation import ReachabilityFlappySim
+
+@functools.lru_cache(maxsize=32)
+def _make_reach_flappy(max_t: float, max_j: int, sample_rate: float, seed: int, start_state: Tuple[Tuple[str, float], ...], use_level_cache: bool = True, backend: str = "numba") -> "ReachabilityFlappySim":
+    """Build a forward flappy sim, or hand back the one we already built for these exact args.
+       Level gen only happens once per config, which adds up when these handlers get called
+       in a loop from a script. start_state comes in as the items of the start state dict,
+       so it can be part of the cache key
+    """
+    from flappy.reachability.flappy_simulation import ReachabilityFlappySim
+    import numpy as np
+    return ReachabilityFlappySim(max_t, max_j, sample_rate, dict(start_state), seed, np.random.default_rng(seed), _load_level(seed, use_level_cache), backend)
+
+def _load_level(seed: int, use_level_cache: bool) -> Optional["FlappyLevel"]:
+    """The on-disk cached level for seed, or None to let the sim generate one itself.
+       See _use_level_cache for when use_level_cache should be set"""
+    if not use_level_cache:
+        return None
+    from flappy.flappy_level import FlappyLevel
+    return FlappyLevel.cached_procedural_gen(seed)
+
+def _use_level_cache(args) -> bool:
+    """Only levels from a --seed the user gave are worth caching. Without one every run gets a
+       fresh random seed, and caching those would just fill the cache dir with levels nobody
+       asks for again
+    """
+    return args.seed is not None and not args.no_level_cache
 
-from ball_bounce.reachability.ball_simulation import ReachabilityBallSim
-from ball_bounce.feasibility.ball_simulation import FeasibilityBallSim
-from hybrid_models.hybrid_result_plotter import HybridResultPlotter
+def _resolve_seed(args) -> int:
+    """The level seed from args, or a fresh random one if none was given"""
+    return args.seed if args.seed is not None else secrets.randbits(32)
+
+def _load_samples(args) -> "np.ndarray":
+    """Pull the raw input samples out of args as one contiguous int8 array, either from
+       --samples or, for long sequences, a --samples_file of raw bytes. argparse already
+       checked them, see _sample_value, _load_samples_file and _check_samples
+    """
+    import numpy as np
+    samples = args.samples_file if args.samples_file is not None else args.samples
+    return np.ascontiguousarray(samples, dtype=np.int8)
+
+def _check_samples(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """ Samples are evenly spaced from the start of a run to the end of it, so a run needs
+        at least two of them. argparse can't count nargs="+" for us, so this gets called
+        once everything's parsed. Does nothing for commands that don't take samples
+    """
+    if not hasattr(args, "samples"):
+        return
+    samples = args.samples_file if args.samples_file is not None else args.samples
+    if len(samples) < 2:
+        parser.error(f"need at least 2 samples (one at the start of the run, one at the end), got {len(samples)}")
+
+def _dump_results(args, results: List["HybridResult"]) -> None:
+    """If --dump was given, save results to that path as a compressed .npz. Result i is
+       stored as result_i_times, result_i_states, result_i_jumps and result_i_successful,
+       plus result_i_samples and result_i_sample_times if it had an input sequence
+    """
+    if args.dump is None:
+        return
+    import numpy as np
+    arrays = {}
+    for idx, result in enumerate(results):
+        prefix = f"result_{idx}_"
+        arrays[prefix + "times"] = np.array([point.time for point in result.sim_result], dtype=np.float64)
+        arrays[prefix + "states"] = np.array([point.state.to_array() for point in result.sim_result])
+        arrays[prefix + "jumps"] = np.array([point.jumps for point in result.sim_result], dtype=np.int64)
+        arrays[prefix + "successful"] = np.array(result.successful)
+        if result.input_sequence is not None:
+            arrays[prefix + "samples"] = np.asarray(result.input_sequence.samples)
+            arrays[prefix + "sample_times"] = np.asarray(result.input_sequence.times, dtype=np.float64)
+    np.savez_compressed(args.dump, **arrays)
 
 def single_ball_run(args) -> None:
     """Perform a single run of a bouncing ball
@@ -19,13 +98,26 @@ def single_ball_run(args) -> None:
     max_t = args.max_time
     max_j = args.max_jumps
     # TODO: lol some validation maybe?
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
-
-    sim = ReachabilityBallSim(max_t,  max_j, start_state)
+    start_state = args.start_state
+
+    if args.analytic:
+        from ball_bounce.analytic_ball_simulation import AnalyticBallSim
+        sim = AnalyticBallSim(max_t, max_j, start_state)
+    elif args.fixed_step:
+        from ball_bounce.reachability.batched_ball_simulation import BatchedForwardBallSim
+        # a batch of one
+        sim = BatchedForwardBallSim(max_t, max_j, [start_state])
+    else:
+        from ball_bounce.reachability.ball_simulation import ReachabilityBallSim
+        sim = ReachabilityBallSim(max_t,  max_j, start_state, args.jit)
     result = sim.single_run()
-    print("BIG OLD DATA DUMP INC")
-    print(result)
+    if args.verbose:
+        print("BIG OLD DATA DUMP INC")
+        print(result)
+    _dump_results(args, [result])
+    if args.no_plot:
+        return
+    from hybrid_models.hybrid_result_plotter import HybridResultPlotter
     plotter = HybridResultPlotter([result])
     plotter.plot_state_over_time(["Height", "Vertical Velocity"], "Ball Height")
 
@@ -37,13 +129,22 @@ def single_backwards_ball_run(args) -> None:
     max_t = args.max_time
     max_j = args.max_jumps
     # TODO: lol some validation maybe?
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
-
-    sim = FeasibilityBallSim(max_t, max_j, start_state)
+    start_state = args.start_state
+
+    if args.analytic:
+        from ball_bounce.analytic_ball_simulation import AnalyticBallSim
+        sim = AnalyticBallSim(max_t, max_j, start_state, backwards=True)
+    else:
+        from ball_bounce.feasibility.ball_simulation import FeasibilityBallSim
+        sim = FeasibilityBallSim(max_t, max_j, start_state, args.jit)
     result = sim.single_run()
-    print("BIG OLD DATA DUMP INC")
-    print(result)
+    if args.verbose:
+        print("BIG OLD DATA DUMP INC")
+        print(result)
+    _dump_results(args, [result])
+    if args.no_plot:
+        return
+    from hybrid_models.hybrid_result_plotter import HybridResultPlotter
     plotter = HybridResultPlotter([result])
     plotter.plot_state_over_time(["Height", "Vertical Velocity"], "Ball Height")
 
@@ -53,22 +154,23 @@ def single_flappy_run(args) -> None:
          args (Namespace): command line arguments from argparse
     """
     sample_rate = args.sample_rate
-    samples = args.samples
-    seed = args.seed
+    samples = _load_samples(args)
+    seed = _resolve_seed(args)
     max_j = args.max_jumps
     # TODO: lol some validation maybe?
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
-
-    random.seed(seed)
     # derive the end time from the provided samples + sampling rate
     num_samples = len(samples) - 1
     max_t = num_samples * sample_rate
 
-    sim = ReachabilityFlappySim(max_t, max_j, sample_rate, start_state, seed)
-    result = sim.single_run(samples)
-    print("BIG OLD DATA DUMP INC")
-    print(result)
+    sim = _make_reach_flappy(max_t, max_j, sample_rate, seed, tuple(args.start_state.items()), _use_level_cache(args), args.jit)
+    result = sim.single_run(samples, args.fixed_step)
+    if args.verbose:
+        print("BIG OLD DATA DUMP INC")
+        print(result)
+    _dump_results(args, [result])
+    if args.no_plot:
+        return
+    from hybrid_models.hybrid_result_plotter import HybridResultPlotter
     plotter = HybridResultPlotter([result], sim.model.level)
     plotter.plot_state_and_input_over_time(["X Pos", "Y Pos", "Y Vel", "Pressed"], "Forward Flappy Breakdown")
     #plotter.plot_state_over_state(0, 1, "X Pos", "Y Pos", "Flappy Position")
@@ -80,21 +182,26 @@ def single_backwards_flappy_run(args) -> None:
          args (Namespace): command line arguments from argparse
     """
     sample_rate = args.sample_rate
-    samples = args.samples
-    seed = args.seed
+    samples = _load_samples(args)
+    seed = _resolve_seed(args)
     max_j = args.max_jumps
      # TODO: lol some validation maybe?
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
+    start_state = args.start_state
 
-    random.seed(seed)
     # derive the end time from the provided samples + sampling rate
     num_samples = len(samples) - 1
     max_t = num_samples * sample_rate
-    sim = FeasibilityFlappySim(max_t, max_j, sample_rate, start_state, seed)
-    result = sim.single_run(samples)
-    print("BIG OLD DATA DUMP INC")
-    print(result)
+    import numpy as np
+    from flappy.feasibility.flappy_simulation import FeasibilityFlappySim
+    sim = FeasibilityFlappySim(max_t, max_j, sample_rate, start_state, seed, np.random.default_rng(seed), _load_level(seed, _use_level_cache(args)), args.jit)
+    result = sim.single_run(samples, args.fixed_step)
+    if args.verbose:
+        print("BIG OLD DATA DUMP INC")
+        print(result)
+    _dump_results(args, [result])
+    if args.no_plot:
+        return
+    from hybrid_models.hybrid_result_plotter import HybridResultPlotter
     plotter = HybridResultPlotter([result], sim.model.level, sim.model.start_state)
     #plotter.plot_state_and_input_over_time(["X Pos", "Y Pos", "Y Vel", "Pressed"], "Backward Flappy Breakdown")
     plotter.plot_state_over_state(0, 1, "X Pos", "Y Pos", "Flappy Position")
@@ -108,24 +215,33 @@ def find_flappy_reachability_bounds(args) -> None:
     max_j = args.max_jumps
     num_samples = args.num_samples
     sample_rate = args.sample_rate
-    seed = args.seed
-    # TODO: lol some validation maybe?
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
-
-    random.seed(seed)
-    # handle invalid args
-    if max_t is None and num_samples is None:
-        raise ValueError("Need to specify a max_time or num_samples!")
-
+    seed = _resolve_seed(args)
+    # NOTE: argparse makes sure we got exactly one of max_time or num_samples
     # derive max time
     if num_samples:
         max_t = num_samples * sample_rate
 
-    sim = ReachabilityFlappySim(max_t, max_j, sample_rate, start_state, seed)
-    results = sim.reachability_simulation()
-    plotter = HybridResultPlotter(results[0] + results[1], sim.model.level)
-    plotter.plot_reachability(0, 1, "X Pos", "Y Pos", "Flappy Position")
+    sim = _make_reach_flappy(max_t, max_j, sample_rate, seed, tuple(args.start_state.items()), _use_level_cache(args), args.jit)
+    if args.parallel:
+        upper_results, lower_results = sim.reachability_simulation(parallel=True)
+        results = iter(upper_results + lower_results)
+    else:
+        # stream runs in as they finish, so we only hang onto the ones we're going to use
+        results = sim.iter_reachability_simulation()
+
+    plotter = None
+    if not args.no_plot:
+        from hybrid_models.hybrid_result_plotter import HybridResultPlotter
+        plotter = HybridResultPlotter([], sim.model.level)
+    results_to_dump = []
+    for result in results:
+        if args.dump is not None:
+            results_to_dump.append(result)
+        if plotter is not None:
+            plotter.extend([result])
+    _dump_results(args, results_to_dump)
+    if plotter is not None:
+        plotter.plot_reachability(0, 1, "X Pos", "Y Pos", "Flappy Position")
 
 def find_feasibility_set(args) -> None:
     """Do a feasibility analysis of Flappy, looking for a set of feasible points
@@ -133,23 +249,44 @@ def find_feasibility_set(args) -> None:
     max_t = args.max_time
     max_j = args.max_jumps
     sample_rate = args.sample_rate
-    seed = args.seed
+    seed = _resolve_seed(args)
     goal = args.goal
     stride_points = args.stride_points
     #TODO: lol som validation maybe
-    with open(args.start_state, 'r') as f:
-        start_state = json.load(f)
-    random.seed(seed)
-
-    sim = FeasibilityFlappySim(max_t, max_j, sample_rate, start_state, seed)
-    #results = sim.feasibility_set(sim.model.start_state, goal, stride_points)
-    results = sim._plot_input_sequence_bounds()
-    #plotter = HybridResultPlotter(results, sim.model.level, sim.model.start_state)
-    #plotter.plot_state_over_state_unique(0, 1, "X Pos", "Y Pos", "Flappy Position")
+    start_state = args.start_state
+
+    import numpy as np
+    from flappy.feasibility.flappy_simulation import FeasibilityFlappySim
+    sim = FeasibilityFlappySim(max_t, max_j, sample_rate, start_state, seed, np.random.default_rng(seed), _load_level(seed, _use_level_cache(args)), args.jit)
+    if args.bounds_only:
+        # just the upper and lower bound searches from the start state, what this used to show
+        upper_results, lower_results = sim._plot_input_sequence_bounds()
+        results = upper_results + lower_results
+    else:
+        #results = sim.feasibility_set(sim.model.start_state, goal, stride_points)
+        results = sim.feasibility_batched(sim.model.start_state, goal, stride_points, args.fixed_step)
  
     #solution_set = sim._plot_bounds_recursively(sim.model.start_state, goal, stride_points)
-    plotter = HybridResultPlotter(results[0] + results[1], sim.model.level, sim.model.start_state)
-    plotter.plot_reachability(0, 1, "X Pos", "Y Pos", "Feasible Flappy Solutions")
+    _dump_results(args, results)
+    if args.no_plot:
+        return
+    from hybrid_models.hybrid_result_plotter import HybridResultPlotter
+    plotter = HybridResultPlotter(results, sim.model.level, sim.model.start_state)
+    if args.bounds_only:
+        plotter.plot_reachability(0, 1, "X Pos", "Y Pos", "Feasible Flappy Solutions")
+    else:
+        plotter.plot_state_over_state_unique(0, 1, "X Pos", "Y Pos", "Feasible Flappy Solutions")
+
+# which handler runs for each command the parser can set. The parser only ever holds onto
+# these string keys, and handlers import whatever sim they need when they run
+_HANDLERS = {
+    "single_ball": single_ball_run,
+    "single_backwards_ball": single_backwards_ball_run,
+    "single_flappy": single_flappy_run,
+    "flappy_reachability": find_flappy_reachability_bounds,
+    "single_backwards_flappy": single_backwards_flappy_run,
+    "flappy_feasibility": find_feasibility_set,
+}
 
 def build_cli_parser() -> argparse.ArgumentParser:
     """Build out a complex tree of subparsers for handling various
@@ -159,6 +296,12 @@ def build_cli_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="HyEQGameSim", description="A Hybrid Equations Simulator for Video Games"
     )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Print out every point of a single run's result"
+    )
     model_parsers = parser.add_subparsers(
         description="Subparsers for which model we're running on"
     )
@@ -171,6 +314,12 @@ def build_cli_parser() -> argparse.ArgumentParser:
     _add_max_time_argument(single_ball_parser)
     _add_max_jumps_argument(single_ball_parser)
     _add_start_state_argument(single_ball_parser)
+    _add_output_arguments(single_ball_parser)
+    # both skip the solver, so it's one or the other
+    ball_solver_group = single_ball_parser.add_mutually_exclusive_group()
+    _add_analytic_argument(ball_solver_group)
+    _add_fixed_step_argument(ball_solver_group)
+    _add_jit_argument(single_ball_parser)
 
     # backwards ball time
     backwards_ball_parser = model_parsers.add_parser("backwards_ball", help="For simulating a simple backwards-in-time Bouncing Ball example!")
@@ -181,6 +330,9 @@ def build_cli_parser() -> argparse.ArgumentParser:
     _add_max_time_argument(single_backwards_ball_parser)
     _add_max_jumps_argument(single_backwards_ball_parser)
     _add_start_state_argument(single_backwards_ball_parser)
+    _add_output_arguments(single_backwards_ball_parser)
+    _add_analytic_argument(single_backwards_ball_parser)
+    _add_jit_argument(single_backwards_ball_parser)
 
     # flappy time
     flappy_parser = model_parsers.add_parser("flappy", help="For simulating Flappy Bird!")
@@ -191,9 +343,16 @@ def build_cli_parser() -> argparse.ArgumentParser:
     single_flappy_parser = flappy_analysis_parsers.add_parser("single", help="For doing single runs")
     _add_sample_rate(single_flappy_parser)
     _add_seed(single_flappy_parser)
+    _add_level_cache_argument(single_flappy_parser)
     _add_max_jumps_argument(single_flappy_parser)
-    _add_raw_samples_argument(single_flappy_parser)
+    # one or the other, never neither
+    single_flappy_samples = single_flappy_parser.add_mutually_exclusive_group(required=True)
+    _add_raw_samples_argument(single_flappy_samples)
+    _add_raw_samples_file_argument(single_flappy_samples)
     _add_start_state_argument(single_flappy_parser)
+    _add_output_arguments(single_flappy_parser)
+    _add_jit_argument(single_flappy_parser)
+    _add_fixed_step_argument(single_flappy_parser)
 
     # reachability analysis
     reachability_flappy_parser = flappy_analysis_parsers.add_parser(
@@ -201,12 +360,16 @@ def build_cli_parser() -> argparse.ArgumentParser:
     )
     _add_sample_rate(reachability_flappy_parser)
     _add_seed(reachability_flappy_parser)
+    _add_level_cache_argument(reachability_flappy_parser)
     _add_max_jumps_argument(reachability_flappy_parser)
     _add_start_state_argument(reachability_flappy_parser)
+    _add_output_arguments(reachability_flappy_parser)
 
-    bounds_number_of_samples_group = reachability_flappy_parser.add_mutually_exclusive_group()
+    bounds_number_of_samples_group = reachability_flappy_parser.add_mutually_exclusive_group(required=True)
     _add_max_time_argument(bounds_number_of_samples_group)
     _add_num_samples_argument(bounds_number_of_samples_group)
+    _add_parallel_argument(reachability_flappy_parser)
+    _add_jit_argument(reachability_flappy_parser)
 
     # backwards flappy time
     backwards_flappy_parser = model_parsers.add_parser("backwards_flappy", help="For simulating Flappy Bird backwards in time!")
@@ -217,32 +380,44 @@ def build_cli_parser() -> argparse.ArgumentParser:
     single_backwards_flappy_parser = backwards_flappy_analysis_parsers.add_parser("single", help="For doing single runs")
     _add_sample_rate(single_backwards_flappy_parser)
     _add_seed(single_backwards_flappy_parser)
+    _add_level_cache_argument(single_backwards_flappy_parser)
     _add_max_jumps_argument(single_backwards_flappy_parser)
-    _add_raw_samples_argument(single_backwards_flappy_parser)
+    # one or the other, never neither
+    single_backwards_flappy_samples = single_backwards_flappy_parser.add_mutually_exclusive_group(required=True)
+    _add_raw_samples_argument(single_backwards_flappy_samples)
+    _add_raw_samples_file_argument(single_backwards_flappy_samples)
     _add_start_state_argument(single_backwards_flappy_parser)
+    _add_output_arguments(single_backwards_flappy_parser)
+    _add_jit_argument(single_backwards_flappy_parser)
+    _add_fixed_step_argument(single_backwards_flappy_parser)
 
     # feasibility 
     feasibility_flappy_parser = backwards_flappy_analysis_parsers.add_parser("feasibility", help="For finding feasibility sets") 
     _add_sample_rate(feasibility_flappy_parser)
     _add_seed(feasibility_flappy_parser)
+    _add_level_cache_argument(feasibility_flappy_parser)
     _add_start_state_argument(feasibility_flappy_parser)
+    _add_output_arguments(feasibility_flappy_parser)
     _add_max_time_argument(feasibility_flappy_parser)
     _add_max_jumps_argument(feasibility_flappy_parser) 
     _add_goal_argument(feasibility_flappy_parser)
     _add_stride_points_argument(feasibility_flappy_parser)
+    _add_jit_argument(feasibility_flappy_parser)
+    _add_fixed_step_argument(feasibility_flappy_parser)
+    _add_bounds_only_argument(feasibility_flappy_parser)
 
     # single run of bouncing ball
-    single_ball_parser.set_defaults(func=single_ball_run)
+    single_ball_parser.set_defaults(command="single_ball")
     # single run of backwards bouncing ball
-    single_backwards_ball_parser.set_defaults(func=single_backwards_ball_run)
+    single_backwards_ball_parser.set_defaults(command="single_backwards_ball")
     # single run flappy
-    single_flappy_parser.set_defaults(func=single_flappy_run)
+    single_flappy_parser.set_defaults(command="single_flappy")
     # bounds run flappy
-    reachability_flappy_parser.set_defaults(func=find_flappy_reachability_bounds)
+    reachability_flappy_parser.set_defaults(command="flappy_reachability")
     # single run of backwards flappy
-    single_backwards_flappy_parser.set_defaults(func=single_backwards_flappy_run)
+    single_backwards_flappy_parser.set_defaults(command="single_backwards_flappy")
     # feasibility run
-    feasibility_flappy_parser.set_defaults(func=find_feasibility_set)
+    feasibility_flappy_parser.set_defaults(command="flappy_feasibility")
 
     return parser
 
@@ -303,8 +478,18 @@ def _add_seed(parse_obj):
         "-d",
         "--seed",
         type=int,
-        help="Level generation seed",
-        default=random.randint(0, 10000),
+        help="Level generation seed. Random if not provided",
+        default=None,
+    )
+
+def _add_level_cache_argument(parse_obj):
+    """ Add the option to skip the on-disk level cache (~/.cache/hyeq) and always generate
+        the level fresh. Only seeded runs use the cache to begin with
+    """
+    parse_obj.add_argument(
+        "--no-level-cache",
+        action="store_true",
+        help="Generate the level from --seed instead of loading a cached copy. Runs without --seed never use the cache"
     )
 
 def _add_raw_samples_argument(parse_obj):
@@ -314,21 +499,86 @@ def _add_raw_samples_argument(parse_obj):
     parse_obj.add_argument(
         "-s",
         "--samples",
-        type=int,
-        nargs="*",
-        help="Specify a list of sample values directly" 
+        type=_sample_value,
+        nargs="+",
+        help="Specify a list of sample values directly, each 0 (not pressed) or 1 (pressed)"
+    )
+
+def _add_raw_samples_file_argument(parse_obj):
+    """ Add the ability to load samples from a file of raw bytes, one sample per byte.
+        Handy when a sample list is too long to type out
+    """
+    parse_obj.add_argument(
+        "--samples_file",
+        type=_load_samples_file,
+        help="Specify a file of raw sample bytes (one int8 per sample) instead of listing them"
     )
 
+def _sample_value(raw: str) -> int:
+    """ argparse type for a single sample. Flappy only has one button, so it's a 0 or a 1
+    """
+    if raw not in ("0", "1"):
+        raise argparse.ArgumentTypeError(f"samples should be 0 (not pressed) or 1 (pressed), got {raw!r}")
+    return int(raw)
+
+def _load_samples_file(path: str) -> "np.ndarray":
+    """ argparse type for --samples_file: read the raw bytes once and check every one is a
+        0 or a 1, handing back the int8 array
+    """
+    import numpy as np
+    try:
+        samples = np.fromfile(Path(path), dtype=np.int8)
+    except OSError as err:
+        raise argparse.ArgumentTypeError(f"couldn't load samples {path}: {err}")
+    if samples.size and (samples.min() < 0 or samples.max() > 1):
+        raise argparse.ArgumentTypeError(f"samples file {path} should only hold 0 (not pressed) or 1 (pressed) bytes")
+    return samples
+
+def _load_start_state(path: str) -> Dict[str, float]:
+    """ argparse type for start states: load the json once, check it's a flat object of
+        numbers, and hand back those numbers as floats, ready for from_properties
+    """
+    try:
+        with open(Path(path), 'rb') as f:
+            raw_state = _json_loads(f.read())
+    except (OSError, ValueError) as err:
+        raise argparse.ArgumentTypeError(f"couldn't load start state {path}: {err}")
+    if not isinstance(raw_state, dict):
+        raise argparse.ArgumentTypeError(f"start state {path} should be a json object")
+    start_state = {}
+    for name, value in raw_state.items():
+        # bools are ints to python, but not to us
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise argparse.ArgumentTypeError(f"start state {path}: {name} should be a number, got {value!r}")
+        start_state[name] = float(value)
+    return start_state
+
 def _add_start_state_argument(parse_obj):
     """ Add the ability to specify the start state to the parser
     """
     parse_obj.add_argument(
         "-f",
         "--start_state",
-        type=Path,
+        type=_load_start_state,
+        required=True,
         help="specify the path to a starting state for this model",
     )
 
+def _add_output_arguments(parse_obj):
+    """ Add the options for what to do with results: save them, and/or skip plotting.
+        Skipping the plot means matplotlib never gets imported, so runs can go headless
+    """
+    parse_obj.add_argument(
+        "--dump",
+        type=Path,
+        help="Save the results to this path as a compressed .npz"
+    )
+    parse_obj.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Don't plot the results"
+    )
+
 def _add_goal_argument(parse_obj):
     """ Add a goal argument
         TODO: this should be customizable to _any_ state parameter?
@@ -350,11 +600,156 @@ def _add_stride_points_argument(parse_obj):
         help="Number of points to use per feasibility stride"
     )
 
+def _add_analytic_argument(parse_obj):
+    """ Add the option to skip the solver and use a closed form solution instead,
+        for models simple enough to have one
+    """
+    parse_obj.add_argument(
+        "-a",
+        "--analytic",
+        action="store_true",
+        help="Solve each arc in closed form instead of with the hybrid solver"
+    )
+
+def _add_fixed_step_argument(parse_obj):
+    """ Add the option to skip the solver and run a compiled fixed step loop instead,
+        for models that have one
+    """
+    parse_obj.add_argument(
+        "--fixed-step",
+        action="store_true",
+        help="Run a compiled fixed step loop instead of the hybrid solver. Much faster, \
+            but jumps land on step boundaries"
+    )
+
+def _add_bounds_only_argument(parse_obj):
+    """ Add the option to only search for the bounds from the start state, instead of the
+        whole feasibility set
+    """
+    parse_obj.add_argument(
+        "--bounds-only",
+        action="store_true",
+        help="Only find the upper and lower bound from the start state and plot them like a \
+            reachability analysis, instead of walking strides out to the goal"
+    )
+
+def _add_jit_argument(parse_obj):
+    """ Add the option to run model kernels compiled (numba) or as plain python, for A/B
+        timing or to skip compiling entirely. python turns Numba off before any kernel module
+        gets imported, see hybrid_models.jit
+    """
+    parse_obj.add_argument(
+        "--jit",
+        choices=["numba", "python"],
+        default="numba",
+        help="Run the model kernels compiled with numba, or as plain python"
+    )
+
+def _add_parallel_argument(parse_obj):
+    """ Add the option to search for the upper and lower bounds at the same time
+    """
+    parse_obj.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Find the upper and lower bounds in two worker processes instead of one after the other. \
+            Starting the workers takes a few seconds, so this only pays off for large runs"
+    )
+
+def _warm_ball_kernels(args, backwards: bool) -> None:
+    """ Warm the kernels a ball run uses, forward or backward. Analytic runs don't use any,
+        and --fixed-step runs only use the batched kernels. Those are parallel, which makes
+        even loading them from cache slow enough that it's not worth doing up front
+    Args:
+        args (Namespace): command line arguments from argparse for bouncing ball
+        backwards (bool): warm the feasibility (backward) kernels instead of the forward ones
+    """
+    if args.analytic or getattr(args, "fixed_step", False):
+        return
+    if backwards:
+        from ball_bounce.feasibility import ball_kernels as kernels
+    else:
+        from ball_bounce.reachability import ball_kernels as kernels
+    kernels.flow_kernel(0.0, 9.81)
+    kernels.jump_kernel(0.0, -0.5)
+    kernels.jump_check_kernel(1.0, 0.0)
+
+def _warm_flappy_kernels(args, backwards: bool) -> None:
+    """ Warm the kernels a flappy run uses, forward or backward. The batch solve kernel only
+        gets warmed for --fixed-step runs, since nothing else calls it and even loading a
+        parallel kernel from cache isn't free
+    Args:
+        args (Namespace): command line arguments from argparse for flappy
+        backwards (bool): warm the feasibility (backward) kernels instead of the forward ones
+    """
+    import numpy as np
+    from flappy import flappy_kernels as shared_kernels
+    if backwards:
+        from flappy.feasibility import flappy_kernels as kernels
+    else:
+        from flappy.reachability import flappy_kernels as kernels
+    kernels.falling_flow_kernel(0.0, 2.0, 2.0, 9.81)
+    kernels.flapping_flow_kernel(0.0, 2.0, 2.0, 9.81)
+    edges = np.zeros(1, dtype=np.float64)
+    shared_kernels.collision_kernel(0.0, 1.0, edges, edges, edges, edges, 0.0, 0.0, 5.0)
+
+    if not getattr(args, "fixed_step", False):
+        return
+    # same types the sims hand over: a one sequence, one sample, one step batch
+    start_states = np.zeros((1, 4), dtype=np.float64)
+    samples = np.zeros((1, 1), dtype=np.float64)
+    # the backward kernel also takes the fall start times, which are shaped like samples
+    input_args = (samples, edges, samples) if backwards else (samples, edges)
+    level_args = (edges, edges, edges, edges, 0.0, 0.0, 5.0)
+    outputs = (
+        np.empty((1, 2, 4), dtype=np.float64),
+        np.empty((1, 2), dtype=np.int64),
+        np.zeros(1, dtype=np.int64),
+        np.zeros(1, dtype=np.bool_)
+    )
+    kernels.batch_solve_kernel(start_states, *input_args, 0.01, 1, 0.01, 1, 2.0, 2.0, 9.81, *level_args, *outputs)
+
+# which kernels each command in _HANDLERS runs, so _warm_jit only touches those
+_WARMUPS = {
+    "single_ball": functools.partial(_warm_ball_kernels, backwards=False),
+    "single_backwards_ball": functools.partial(_warm_ball_kernels, backwards=True),
+    "single_flappy": functools.partial(_warm_flappy_kernels, backwards=False),
+    "flappy_reachability": functools.partial(_warm_flappy_kernels, backwards=False),
+    "single_backwards_flappy": functools.partial(_warm_flappy_kernels, backwards=True),
+    "flappy_feasibility": functools.partial(_warm_flappy_kernels, backwards=True),
+}
+
+def _warm_jit(command: str, args: argparse.Namespace) -> None:
+    """ Touch the Numba kernels command is going to use once, so compiled versions get written
+        to (or loaded from) Numba's on-disk cache up front. Only the first ever run pays for
+        compiling, after that this is a cache load. Set HYEQ_SKIP_WARMUP to skip it
+    Args:
+        command (str): the _HANDLERS key about to run
+        args (Namespace): command line arguments from argparse, for the options that change
+                          which kernels get used (--analytic, --fixed-step)
+    """
+    from hybrid_models.jit import NUMBA_AVAILABLE
+    if not NUMBA_AVAILABLE:
+        # nothing to warm up, it's all plain python
+        return
+    _WARMUPS[command](args)
+
 if "__main__" == __name__:
     # parse arguments
     parser = build_cli_parser()
     args: argparse.Namespace = parser.parse_args()
-    args.func(args)
+    _check_samples(parser, args)
+    command = getattr(args, "command", None)
+    if command is None:
+        # didn't get far enough down the subparsers to pick something to run
+        parser.print_help()
+    else:
+        if getattr(args, "jit", "numba") == "python":
+            # kernel modules haven't been imported yet, so they never touch Numba
+            os.environ["HYEQ_JIT"] = "python"
+        # nothing to warm up if we're not going to use the compiled kernels
+        elif not os.environ.get("HYEQ_SKIP_WARMUP"):
+            _warm_jit(command, args)
+        _HANDLERS[command](args)
 
 # running our model on some different resolutions
 # run_model(0.3, 1/60) # 60 fps
@@ -0,0 +1,125 @@
+""" Arithmetic kernels for the backwards-in-time flappy bird. These get called at least once
+    per integrator substep, so they take plain floats (and the level's flat obstacle arrays)
+    rather than FlappyState/FlappyParams objects, which lets Numba compile them.
+    Signatures are spelled out so Numba compiles (or loads from its cache) at import, rather
+    than stalling the first solver call. The batched driver at the bottom is the exception:
+    it only gets used for fixed step runs, so it compiles on first use (cli's _warm_jit
+    fills Numba's cache for it) instead of making every import pay for a parallel compile.
+"""
+from typing import Tuple
+import numpy as np
+from hybrid_models.jit import njit, prange
+# lives with the direction-agnostic kernels, but batch_solve_kernel (and the model) use it from here
+from ..flappy_kernels import collision_kernel
+
+
+@njit("UniTuple(float64, 3)(float64, float64, float64, float64)", cache=True, fastmath=True)
+def falling_flow_kernel(y_vel: float, pressed_x_vel: float, pressed_y_vel: float, gamma: float) -> Tuple[float, float, float]:
+    """d[x_pos]/dt, d[y_pos]/dt and d[y_vel]/dt going backwards in time, while falling (pressed == 0)"""
+    return -pressed_x_vel, -y_vel, gamma
+
+@njit("UniTuple(float64, 3)(float64, float64, float64, float64)", cache=True, fastmath=True)
+def flapping_flow_kernel(y_vel: float, pressed_x_vel: float, pressed_y_vel: float, gamma: float) -> Tuple[float, float, float]:
+    """d[x_pos]/dt, d[y_pos]/dt and d[y_vel]/dt going backwards in time, while flapping (pressed == 1).
+       Same arguments as falling_flow_kernel so the model can pick either one by pressed"""
+    return -pressed_x_vel, -pressed_y_vel, 0.0
+
+@njit("int64(float64, float64, float64[::1])", cache=True)
+def sample_index_kernel(time: float, max_sample_time: float, times: np.ndarray) -> int:
+    """Index of the input sample in effect at solver time `time`, going backwards in time. Same
+       lookup as BackwardsFlappyModel.get_input: flip time around the last sample, then take the
+       closest sample at or before it. -1 if there isn't one
+    """
+    flipped_time = max_sample_time - time if time < max_sample_time else 0.0
+    return np.searchsorted(times, flipped_time, side="right") - 1
+
+@njit(cache=True, parallel=True)
+def batch_solve_kernel(
+    start_states,
+    samples,
+    times,
+    fall_start_times,
+    dt,
+    n_steps,
+    t_max,
+    j_max,
+    pressed_x_vel,
+    pressed_y_vel,
+    gamma,
+    x_lo,
+    x_hi,
+    y_lo,
+    y_hi,
+    max_obstacle_width,
+    lower_bound,
+    upper_bound,
+    trajectory,
+    trajectory_jumps,
+    steps_taken,
+    collided
+):
+    """Fixed step backwards flappy, one input sequence per prange iteration. Flow is solved
+       exactly over each step, and input only gets looked at on step boundaries.
+    Args:
+        start_states (ndarray): (n_sequences, 4) x_pos, y_pos, y_vel, pressed each sequence starts from
+        samples (ndarray): (n_sequences, n_samples) button values, one row per sequence
+        times (ndarray): (n_samples,) sample times, shared by every sequence
+        fall_start_times (ndarray): (n_sequences, n_samples) for each sample, when the fall it's
+                                    part of started. Only read for samples that are 0
+        dt (float): step size
+        n_steps (int): max number of steps to take
+        t_max (float): when to stop. The last step gets cut short to land on it exactly
+        j_max (int): max number of jumps
+        pressed_x_vel, pressed_y_vel, gamma (float): FlappyParams, unpacked
+        x_lo, x_hi, y_lo, y_hi, max_obstacle_width, lower_bound, upper_bound: the level, see
+                                                                          collision_kernel
+        trajectory (ndarray): (n_sequences, n_steps + 1, 4) states, written per step
+        trajectory_jumps (ndarray): (n_sequences, n_steps + 1) jump counts, written per step
+        steps_taken (ndarray): (n_sequences,) last step written for each sequence
+        collided (ndarray): (n_sequences,) bool, True if that sequence hit something
+    """
+    # NOTE: all float64, on purpose. Each sequence is a serial chain of dependent scalar steps,
+    #       so float32 wouldn't buy any SIMD lanes, and trajectory comes back as FlappyState views,
+    #       which are float64. Rounding y_pos to float32 also moves which step a collision lands on
+    max_sample_time = times[-1]
+    for seq_idx in prange(samples.shape[0]):
+        x_pos = start_states[seq_idx, 0]
+        y_pos = start_states[seq_idx, 1]
+        y_vel = start_states[seq_idx, 2]
+        pressed = start_states[seq_idx, 3]
+        jumps = 0
+        for step in range(n_steps + 1):
+            if step > 0:
+                # flow, exactly
+                step_dt = dt if step < n_steps else t_max - (n_steps - 1) * dt
+                x_pos -= pressed_x_vel * step_dt
+                if pressed == 0:  # falling
+                    y_pos -= y_vel * step_dt + 0.5 * gamma * step_dt * step_dt
+                    y_vel += gamma * step_dt
+                else:  # flapping
+                    y_pos -= pressed_y_vel * step_dt
+            hit = collision_kernel(x_pos, y_pos, x_lo, x_hi, y_lo, y_hi, max_obstacle_width, lower_bound, upper_bound)
+            if not hit and jumps < j_max:
+                time = step * dt if step < n_steps else t_max
+                sample_idx = sample_index_kernel(time, max_sample_time, times)
+                new_pressed = samples[seq_idx, sample_idx]
+                if new_pressed != pressed:
+                    pressed = new_pressed
+                    if new_pressed == 1:
+                        y_vel = -pressed_y_vel
+                    else:
+                        flipped_time = max_sample_time - time if time < max_sample_time else 0.0
+                        y_vel = pressed_y_vel - gamma * (flipped_time - fall_start_times[seq_idx, sample_idx])
+                    jumps += 1
+            # record after jumping, so a start state that jumps right away matches the solver
+            trajectory[seq_idx, step, 0] = x_pos
+            trajectory[seq_idx, step, 1] = y_pos
+            trajectory[seq_idx, step, 2] = y_vel
+            trajectory[seq_idx, step, 3] = pressed
+            trajectory_jumps[seq_idx, step] = jumps
+            steps_taken[seq_idx] = step
+            if hit:
+                collided[seq_idx] = True
+                break
+            if jumps >= j_max:
+                break
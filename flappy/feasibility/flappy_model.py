@@ -1,13 +1,17 @@
 """ Hybrid model for flappy bird
 """
+import bisect
 from typing import List, Tuple, cast
+import numpy as np
+from numpy import ndarray
 from hybrid_models.hybrid_model import HybridModel
+from hybrid_models.jit import pick_backend
 from hybrid_models.hybrid_point import HybridPoint
 from input.input_signal import InputSignal
 from ..flappy_state import FlappyState
 from ..flappy_params import FlappyParams
 from ..flappy_level import FlappyLevel
-from pprint import pprint, pformat
+from .flappy_kernels import falling_flow_kernel, flapping_flow_kernel, collision_kernel
 
 class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
     """It's a hybrid model for flappy bird that works backwards-in-time!
@@ -16,10 +20,12 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
     Attributes:
         start_state (FlappyState): Flappy's start state
         system_params (FlappyParams): constants for simulating flappy
-        level (FlappyLevel): Level to simulate for Flappy
+        level (FlappyLevel): Level to simulate for Flappy. Setting this also caches what
+                             check_collisions needs from it
         t_max (float): max time to simulate out to
         j_max (int): max number of jumps to simulate out to
-        input_sequence (InputSignal): the input sequence to use for simulation
+        input_sequence (InputSignal): the input sequence to use for simulation. Setting this
+                                      also caches its samples and times as arrays
     """
 
     start_state: FlappyState
@@ -36,16 +42,65 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
         t_max: float = 2.0,
         j_max: int = 8,
         input_sequence: InputSignal = InputSignal([], []),
+        backend: str = "numba",
     ):
-        """Constructor"""
+        """Constructor. backend picks compiled (numba) or plain python kernels"""
         super().__init__()
-        self.input_sequence: InputSignal = input_sequence
+        self.input_sequence = input_sequence
         self.j_max = j_max
         self.t_max = t_max
         self.start_state = start_state
         self.system_params = system_params
         self.state_factory = FlappyState
         self.level = level
+        # params are constant, so pull out what the hot path needs as plain floats once
+        self._pressed_x_vel = float(system_params.pressed_x_vel)
+        self._pressed_y_vel = float(system_params.pressed_y_vel)
+        self._gamma = float(system_params.gamma)
+        # indexed by pressed, so flow picks its kernel instead of branching on it
+        self._flow_kernels = (
+            pick_backend(falling_flow_kernel, backend),
+            pick_backend(flapping_flow_kernel, backend),
+        )
+        self._collision_kernel = pick_backend(collision_kernel, backend)
+
+    @property
+    def level(self) -> FlappyLevel:
+        return self._level
+
+    @level.setter
+    def level(self, level: FlappyLevel):
+        self._level = level
+        # everything collision_kernel wants from the level, in its argument order. Pulled out
+        # once here instead of seven attribute lookups (and two float()s) per collision check
+        self._collision_args = (
+            level.x_lo,
+            level.x_hi,
+            level.y_lo,
+            level.y_hi,
+            level.max_obstacle_width,
+            float(level.lower_bound),
+            float(level.upper_bound)
+        )
+
+    @property
+    def input_sequence(self) -> InputSignal:
+        return self._input_sequence
+
+    @input_sequence.setter
+    def input_sequence(self, input_sequence: InputSignal):
+        self._input_sequence = input_sequence
+        # cached once per input sequence rather than rebuilt every time we need them
+        self._samples_arr = np.asarray(input_sequence.samples)
+        self._times_arr = np.asarray(input_sequence.times, dtype=np.float64)
+        self._max_sample_time = input_sequence.times[-1] if input_sequence.times else 0.0
+        # NOTE: InputSignal has no __len__/__bool__, so `not self.input_sequence` was always False.
+        #       This is the check that was meant, and it's one attribute load
+        self._has_input = bool(input_sequence.times)
+        # anything get_input remembered was for the old input sequence
+        self._last_input_key = None
+        self._last_input_val = None
+        self._last_input_idx = None
 
     def get_input(self, time: float, jumps: int) -> Tuple[float, int]:
         """ Sample the input signal for the value of input at the provided time, jumps
@@ -56,61 +111,65 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
         Returns:
             Tuple of [time, button value]
         """
-        if not self.input_sequence:
+        if not self._has_input:
             raise RuntimeError("Need to set an input sequence before getting input!")
 
-        max_sample_time = self.input_sequence.times[-1]
+        # flow_check, jump_check and jump all ask about the same (time, jumps) back to back
+        input_key = (time, jumps)
+        if input_key == self._last_input_key:
+            return self._last_input_val
+
+        max_sample_time = self._max_sample_time
         flipped_sample_time = abs(time - max_sample_time) if time < max_sample_time else 0.0 # need to ceiling this signal
-        # input_sequence is sorted according to time
-        # FIXME: which means there is a better way to do this
-        best_sample_idx = -1
-        best_time = float("inf")
-        # we want to find the closest sample to (time) without going over
+        times = self.input_sequence.times
+        last_idx = self._last_input_idx
+        if (
+            last_idx is not None
+            and times[last_idx] <= flipped_sample_time
+            and (last_idx + 1 == len(times) or flipped_sample_time < times[last_idx + 1])
+        ):
+            # solver steps are way shorter than samples, so we're usually still inside the
+            # same sample as last time. Same sample, same answer
+            self._last_input_key = input_key
+            return self._last_input_val
+
+        # input_sequence is sorted according to time, so we can binary search for
+        # the closest sample to (time) without going over
         # i.e.: never use a future sample to figure out the current value
-        for idx, sequence_values in enumerate(self.input_sequence):
-            sample_time, _ = sequence_values
-            temporal_distance = flipped_sample_time - sample_time
-            if temporal_distance < 0:
-                continue
-            if temporal_distance < best_time:
-                best_time = temporal_distance
-                best_sample_idx = idx
-
-        if best_sample_idx == -1:
+        best_sample_idx = bisect.bisect_right(times, flipped_sample_time) - 1
+        if best_sample_idx < 0:
             raise Exception("Unable to find a good sample!")
 
         # TODO: I have given up. There's just no good way to override __getitem__
         #       so it works like it does for Python builtins
         return_value = cast(Tuple[float, int], self.input_sequence[best_sample_idx])
-        return return_value[0], return_value[1]
+        self._last_input_key = input_key
+        self._last_input_val = (return_value[0], return_value[1])
+        self._last_input_idx = best_sample_idx
+        return self._last_input_val
 
     def reverse_y_vel_from_signal(self, time: float, near_sample_time:float, jumps: int) -> float:
         """ Reverse calculate what the y_vel at the end of a falling state without needing to
             forward simulate it.
         """
-        if not self.input_sequence:
+        if not self._has_input:
             raise RuntimeError("Need to set an input sequence before using it to calculate a final y_vel")
         
-        max_sample_time = self.input_sequence.times[-1]
+        max_sample_time = self._max_sample_time
         flipped_time = abs(time - max_sample_time) if time < max_sample_time else 0.0 # need to ceiling this signal
-        nearest_sample_idx = [idx for idx, sample_value in enumerate(self.input_sequence) if cast(Tuple[float, float | int], sample_value)[0] == near_sample_time][0]
-        falling_samples = []
+        # near_sample_time came out of get_input, so it's an exact match for one of our times
+        nearest_sample_idx = bisect.bisect_left(self.input_sequence.times, near_sample_time)
         # FIXME: I don't think I'm handling strides correctly
-        for signal in self.input_sequence[:nearest_sample_idx + 1][::-1]:
-            # TODO: see above, I can't figure out a good __getitem__ pattern
-            #       so we have this unholy, slow hack instead
-            signal = cast(Tuple[float, float | int], signal)
-            time, sample_value = signal
-        #    print(f"Checking: {time:0.4f}\t{sample_value:0.4f}")
-            if sample_value == 0:
-                falling_samples.append(signal)
-            else:
-                break
-    
-        fall_start_time = falling_samples[-1][0] # comes from a backwards in time list
+        # we've been falling since the sample after the last press at or before near_sample_time,
+        # or since the very start if there's never been one
+        presses = np.flatnonzero(self._samples_arr[:nearest_sample_idx + 1])
+        fall_start_idx = presses[-1] + 1 if presses.size else 0
+        if fall_start_idx > nearest_sample_idx:
+            raise RuntimeError("Can't reverse a y_vel for a sample where the button is pressed!")
+        fall_start_time = float(self._times_arr[fall_start_idx])
 
         # OK! We have all the info we need
-        ending_y_vel = self.system_params.pressed_y_vel + (-self.system_params.gamma) * (flipped_time - fall_start_time)
+        ending_y_vel = self._pressed_y_vel + (-self._gamma) * (flipped_time - fall_start_time)
         return ending_y_vel
 
     def check_collisions(self, state: FlappyState) -> bool:
@@ -121,49 +180,26 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
         Returns:
             bool: True = collision, False = no collision
         """
-        # before we get into obstacles, do some simple "bird must be between these these two
-        # heights" checks
-        if state.y_pos <= self.level.lower_bound:
-            return True
-        if state.y_pos >= self.level.upper_bound:
-            return True
-
-        # very simple collision detection
-        for obstacle in self.level.obstacles:
-            bottom_left_coord, top_right_coord = obstacle
-            if (
-                state.x_pos >= bottom_left_coord[0]
-                and state.x_pos <= top_right_coord[0]
-                and state.y_pos >= bottom_left_coord[1]
-                and state.y_pos <= top_right_coord[1]
-            ):
-                return True
-
-        return False
-
-    def flow(self, hybrid_state: HybridPoint[FlappyState]) -> FlappyState:
+        x_pos, y_pos, _, _ = state.to_list()
+        return self._collision_kernel(x_pos, y_pos, *self._collision_args)
+
+    def flow(self, hybrid_state: HybridPoint[FlappyState]) -> ndarray:
         """Flow function! This should take in y and return dy/dt for working backwards-in-time.
         Args:
             hybrid_state: (HybridPoint[FlappyState]): flappy's current state, along with
                                                       the current time and number of jumps
         Returns:
-            FlappyState: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
+            ndarray: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
         """
-        state = hybrid_state.state
-        # NOTE: we currently overwrite the state and return the same state back
-        #       this works, even though it doesn't make any goddamn sense.
-        if state.pressed == 0:  # falling
-            state.x_pos = -self.system_params.pressed_x_vel
-            state.y_pos = -state.y_vel
-            state.y_vel = self.system_params.gamma
-            state.pressed = 0
-        else:  # flapping (pressed == 1)
-            state.x_pos = -self.system_params.pressed_x_vel
-            state.y_pos = -self.system_params.pressed_y_vel
-            state.y_vel = 0
-            state.pressed = 0
-        
-        return state
+        # NOTE: same deal as the ball models, d[state]/dt gets written straight over the
+        #       solver's scratch copy of state and handed back as-is
+        data = hybrid_state.state.to_array()
+        data[0], data[1], data[2] = self._flow_kernels[int(data[3])](
+            data[2], self._pressed_x_vel, self._pressed_y_vel, self._gamma
+        )
+        # pressed never flows
+        data[3] = 0
+        return data
 
     def jump(self, hybrid_state: HybridPoint[FlappyState]) -> FlappyState:
         """Jump function! This should return a new state after a jump,
@@ -174,19 +210,19 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
         Returns:
             FlappyState: new state after the jump!
         """
-        state = hybrid_state.state
-        time = hybrid_state.time
-        jumps = hybrid_state.jumps
+        state, time, jumps = hybrid_state.state, hybrid_state.time, hybrid_state.jumps
+        # write through the backing array, same as flow, rather than the property setters
+        data = state.to_array()
         # sample input signal
         sample_time, new_pressed = self.get_input(time, jumps)
-        state.pressed = new_pressed
+        data[3] = new_pressed
         # jump according to the new input signal
         if new_pressed == 1:
-            state.y_vel = -self.system_params.pressed_y_vel
+            data[2] = -self._pressed_y_vel
         else:
             # peek back at the input signal, figure out how long flappers has been falling for
             # and set the y vel accordingly
-            state.y_vel = self.reverse_y_vel_from_signal(time, sample_time, jumps)
+            data[2] = self.reverse_y_vel_from_signal(time, sample_time, jumps)
 
         return state
 
@@ -236,3 +272,25 @@ class BackwardsFlappyModel(HybridModel[FlappyState, FlappyParams]):
         if new_pressed != state.pressed:
             return (1, False)
         return (0, False)
+
+    def combined_check(self, hybrid_state: HybridPoint[FlappyState]) -> Tuple[int, int, bool]:
+        """flow_check and jump_check in one go, with one collision check and one input lookup.
+           Flappy can only ever do one or the other: flow while input matches pressed, jump
+           the moment it doesn't
+        Args:
+            hybrid_state: (HybridPoint[FlappyState]): flappy's current state, along with
+                                                      the current time and number of jumps
+        Returns:
+            tuple of three elements:
+                int: 1 for flowin', 0 for not flowin'
+                int: 1 for jumpin', 0 for not jumpin'
+                bool: stop signal, if this is true we need to completely stop the model
+        """
+        state = hybrid_state.state
+        if self.check_collisions(state):
+            return (0, 0, True)
+
+        _, new_pressed = self.get_input(hybrid_state.time, hybrid_state.jumps)
+        if new_pressed != state.pressed:
+            return (0, 1, False)
+        return (1, 0, False)
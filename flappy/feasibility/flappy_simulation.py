@@ -1,89 +1,163 @@
 """ Interfaces for doing reachability and feasibility analysis of flappy bird
 """
+import logging
 import time
-from copy import deepcopy
-from typing import List, Tuple, Dict, Optional
-from hybrid_models.hybrid_point import HybridPoint
+from typing import Iterator, List, Tuple, Dict, Optional
+import numpy as np
+from hybrid_models.hybrid_point import HybridPoint, reverse_time_and_jumps
 from hybrid_models.hybrid_simulation import HybridSim
+from hybrid_models.jit import pick_backend
 from .flappy_model import BackwardsFlappyModel
+from .flappy_kernels import batch_solve_kernel
+from ..flappy_batch_solve import BatchSolveMixin
 from ..flappy_state import FlappyState
 from ..flappy_level import FlappyLevel
 from ..flappy_params import FlappyParams
-from input.input_generators import btn_1_ordered_sequence_generator, btn_1_bounded_sequence_generator, time_sequence
+from input.input_generators import btn_1_ordered_sequence_generator, btn_1_bounded_sequence_generator, btn_1_bounded_sequence_array, time_sequence
 from input.input_signal import InputSignal
 from hybrid_models.hybrid_solver import HyEQSolver
 from hybrid_models.hybrid_result import HybridResult
 
+logger = logging.getLogger(__name__)
 
-class FeasibilityFlappySim(HybridSim[BackwardsFlappyModel]):
+def _copy_points(points) -> List[HybridPoint]:
+    """Copies of points, states and all, so _solve's cache and its callers never share one"""
+    return [HybridPoint(point.time, point.state.clone(), point.jumps) for point in points]
+
+class FeasibilityFlappySim(BatchSolveMixin, HybridSim[BackwardsFlappyModel]):
     """Class to manage simulation runs, and an interface to Do The Thing.
     Attributes:
        t_max (float): max time for a sim run. If we get to t_max, we're successful
        j_max (int): max number of jumps for the sim to run. If we get to j_max, we're successful
        step_time (float): how far apart each sample of the input signal is
        start_params (Dict): starting state of flappy the bird
-       level (FlappyLevel): level to simulate on
+       level (FlappyLevel): level to simulate on, the same one as model.level. Swapping it
+                            drops the solve and bounds caches
        seed (int): seed to use for level generation
     """
     step_time: float
     level: FlappyLevel
     seed: Optional[int]
 
-    def __init__(self, t_max: float, j_max: int, step_time: float, start_params: Dict, seed: Optional[int] = None):
+    # how many solves _solve hangs onto
+    SOLVE_CACHE_SIZE = 4096
+    # how many start states _get_input_sequence_bounds remembers bounds for
+    BOUNDS_CACHE_SIZE = 4096
+
+    def __init__(self, t_max: float, j_max: int, step_time: float, start_params: Dict, seed: Optional[int] = None, rng: Optional[np.random.Generator] = None, level: Optional[FlappyLevel] = None, backend: str = "numba"):
         """set up everything required for a sim run.
         Args:
             t_max (float): see class attribute of the same name
             j_max (int): see class attribute of hte same name
             step_time (float): see class attribute of the same name
             seed (Optional[int]): see class attribute of the same name
+            rng (Optional[np.random.Generator]): generator for level gen. Made from seed if not provided
+            level (Optional[FlappyLevel]): level to use instead of generating one, e.g. from
+                                           FlappyLevel.cached_procedural_gen
+            backend (str): numba for compiled model kernels, python for the plain functions
         """
         self.model = BackwardsFlappyModel(
-            deepcopy(FlappyState.from_properties(**start_params)),
+            FlappyState.from_properties(**start_params),
             FlappyParams(pressed_x_vel=2.0, pressed_y_vel=2.0, gamma=9.81),
-            FlappyLevel.simple_procedural_gen(seed),
+            level if level is not None else FlappyLevel.simple_procedural_gen(seed, rng),
             t_max,
-            j_max
+            j_max,
+            backend=backend
         )
         self.t_max = t_max
         self.j_max = j_max
         self.step_time = step_time
         self.seed = seed
+        self._batch_solve_kernel = pick_backend(batch_solve_kernel, backend)
+        # one solver for every solve this sim does, reset between them
+        self._solver = HyEQSolver(self.model)
+        # (t_max, j_max, start state, input sequence) -> (solution, solver.stop), see _solve
+        self._solve_cache: Dict[Tuple[float, int, bytes, tuple, tuple], Tuple[Tuple[HybridPoint, ...], bool]] = {}
+        # (t_max, j_max, start state, step_time) -> (upper bound, lower bound), see _get_input_sequence_bounds
+        self._bounds_cache: Dict[Tuple[float, int, bytes, float], Tuple[Optional[InputSignal], Optional[InputSignal]]] = {}
+        # the level both caches were filled against, see _check_cache_level
+        self._cache_level = self.model.level
+
+    @property
+    def level(self) -> FlappyLevel:
+        return self.model.level
+
+    @level.setter
+    def level(self, level: FlappyLevel):
+        self.model.level = level
+        self._check_cache_level()
+
+    def _check_cache_level(self) -> None:
+        """ Everything _solve_cache and _bounds_cache hold was solved against one level. If the
+            model's level got swapped out (through the level property or on the model itself),
+            none of it holds any more, so drop both
+        """
+        if self.model.level is not self._cache_level:
+            self._solve_cache.clear()
+            self._bounds_cache.clear()
+            self._cache_level = self.model.level
+
+    def _solve(self, input_sequence: InputSignal) -> Tuple[List[HybridPoint], bool]:
+        """ self._solver.reset(input_sequence) then solve(), but remembering what we got. The bounds
+            search and the strides after it keep landing on the same (start state, input sequence)
+            pairs -- the upper and lower bounds themselves get solved again as the two ends of every
+            bounded stride. Params never change under one sim, so past the start state and input
+            the key only needs t_max and j_max, the same as _get_input_sequence_bounds' key. Both
+            caches get dropped if the level changes
+        Args:
+            input_sequence (InputSignal): input to solve from the model's current start state with
+        Returns:
+            Tuple[List[HybridPoint], bool]: the solution, not yet remapped, and whether the solver
+                                            hard stopped. The list, points and states are the caller's
+                                            to mutate, the cache keeps its own copies. The model's input
+                                            sequence is input_sequence afterwards, hit or miss
+        """
+        self._check_cache_level()
+        key = (self.t_max, self.j_max, self.model.start_state.to_array().tobytes(), tuple(input_sequence.samples), tuple(input_sequence.times))
+        cached = self._solve_cache.get(key)
+        if cached is not None:
+            points, stop = cached
+            # leave the model how a real solve would have
+            self.model.input_sequence = input_sequence
+            return _copy_points(points), stop
+        self._solver.reset(input_sequence)
+        solution = self._solver.solve()
+        if len(self._solve_cache) >= self.SOLVE_CACHE_SIZE:
+            # dicts keep insertion order, so this drops the oldest
+            del self._solve_cache[next(iter(self._solve_cache))]
+        self._solve_cache[key] = (tuple(_copy_points(solution)), self._solver.stop)
+        return solution, self._solver.stop
 
-    def single_run(self, direct_sequence: List[int]) -> HybridResult:
+    def single_run(self, direct_sequence: List[int], fixed_step: bool = False) -> HybridResult:
         """Perform a single run with the given parameters and the provided input samples
         Args:
             direct_sequence: the input samples to use for this run
+            fixed_step (bool): skip HyEQSolver and run the compiled fixed step kernel instead,
+                               see batch_solve
         Returns:
             HybridResult: the result of this simulation
         """
         input_sequence = time_sequence(direct_sequence, self.step_time)
-        # deep copy here because the model can change the state, which can
-        # bubble back to the init parameters
-        print(input_sequence)
-        self.model.input_sequence = input_sequence
-        solver = HyEQSolver(self.model)
+        logger.debug("Input sequence:\n%s", input_sequence)
+        if fixed_step:
+            # a batch of one
+            return self.batch_solve([input_sequence])[0]
+        solver = self._solver
+        solver.reset(input_sequence)
         solution = solver.solve()
 
         # ok, so our hybrid result is in the correct direction, but the times are gonna be
         # backwards, so we remap them.
-        max_solve_time = solution[-1].time
-        max_solve_jumps = solution[-1].jumps
-        for idx, new_time, new_jumps in zip(
-                [i for i in range(0, len(solution))],
-                [abs(max_solve_time - point.time) for point in solution],
-                [abs(max_solve_jumps - point.jumps) for point in solution]):
-            solution[idx].time = new_time
-            solution[idx].jumps = new_jumps
+        reverse_time_and_jumps(solution)
 
         # FIXME: might want to add this explicitly to the solver,
         #       but a solution is valid if the solver didn't hard stop
         #       early (solver.stop)
         return HybridResult(not solver.stop, input_sequence, solution)
     
-    def feasibility_set(self, start_state:FlappyState, goal_x_pos, points_per_stride, depth:int = 0) -> List[HybridResult]:
-        """ Do a feasibility analysis of Flappy
-        TODO: this function is written as _total_ side effect while doing the recursion
-              that's bad! We prefer pure functions!
+    def feasibility_set(self, start_state:FlappyState, goal_x_pos, points_per_stride) -> List[HybridResult]:
+        """ Do a feasibility analysis of Flappy. See iter_feasibility_set, this just collects
+            everything it finds
         Args:
             start_state (FlappyState): the state to start this round of feasability ffinding at
             goal_x_pos (float): the x position we want to eventually get to
@@ -93,90 +167,221 @@ class FeasibilityFlappySim(HybridSim[BackwardsFlappyModel]):
             List: a list of hybrid results for the number of points we want
                   to simulate with
         """
-        print("".join("...." * depth) + f"at depth: {depth}")
+        return list(self.iter_feasibility_set(start_state, goal_x_pos, points_per_stride))
+
+    def iter_feasibility_set(self, start_state:FlappyState, goal_x_pos, points_per_stride) -> Iterator[HybridResult]:
+        """ Do a feasibility analysis of Flappy. Depth first: every stride we solve gets followed
+            all the way down before we try the next input sequence from the same state. Done with an
+            explicit stack rather than recursion, so deep searches don't run into Python's
+            recursion limit and we don't need to save/restore model state around every call
+        Args:
+            start_state (FlappyState): the state to start this round of feasability ffinding at
+            goal_x_pos (float): the x position we want to eventually get to
+            points_per_stride (int): number of valid solutions to use per backwards stride
+                                     -1 for all of them
+        Yields:
+            HybridResult: each stride as soon as it's simulated, in depth first order
+        """
+        restore_state = self.model.start_state
+        # each entry is a state we're expanding, along with the input sequences left to try from it
+        stack: List[Tuple[FlappyState, Iterator[InputSignal]]] = []
+        start_gen = self._stride_sequences(start_state, goal_x_pos, points_per_stride, 0)
+        if start_gen is not None:
+            stack.append((start_state, start_gen))
+
+        try:
+            while stack:
+                state, gen = stack[-1]
+                input_sequence = next(gen, None)
+                if input_sequence is None:
+                    # tried everything from this state
+                    stack.pop()
+                    continue
+                self.model.start_state = state
+                solution, stop = self._solve(input_sequence)
+                if not solution:
+                    # nothing else from this state is going to solve either
+                    stack.pop()
+                    continue
+                # NOTE: time on these solutions is fucky-wucky
+                # .     basically: because we're going back in steps
+                #       we have no idea where the first time point is
+                #       but we always solve "forward" in time
+                # ok, so our hybrid result is in the correct direction, but the times are gonna be
+                # backwards, so we remap them.
+                last_solve_state = solution[-1].state
+                reverse_time_and_jumps(solution)
+                yield HybridResult(not stop, input_sequence, solution)
+                logger.debug("%sgoing deeper", "...." * len(stack))
+                next_gen = self._stride_sequences(last_solve_state, goal_x_pos, points_per_stride, len(stack))
+                if next_gen is not None:
+                    stack.append((last_solve_state, next_gen))
+        finally:
+            # put the model back, even if whoever's iterating stops early
+            self.model.start_state = restore_state
+
+    def _stride_sequences(self, start_state: FlappyState, goal_x_pos, points_per_stride, depth: int) -> Optional[Iterator[InputSignal]]:
+        """ Bounds search for a single stride of feasibility_set
+        Args:
+            start_state (FlappyState): state the stride starts from
+            goal_x_pos (float): the x position we want to eventually get to
+            points_per_stride (int): number of valid solutions to use per backwards stride
+            depth (int): how many strides deep we are, just for logging
+        Returns:
+            Optional[Iterator[InputSignal]]: input sequences to try from start_state, or None if
+                                             we're already at the goal or can't find bounds
+        """
+        logger.debug("%sat depth: %d", "...." * depth, depth)
         depth += 1
-        # update model state
-        self.model.start_state = start_state
+        if start_state.x_pos <= goal_x_pos:
+            logger.debug("%sfound a good solution!", "...." * depth)
+            return None
 
-        if self.model.start_state.x_pos <= goal_x_pos:
-            print("".join("...." * depth) + f"found a good solution!")
-            return []
- 
-        # just going to try and return all the bounds checks
+        # bounds get found from the model's start state
+        self.model.start_state = start_state
         upper_bound, lower_bound = self._get_input_sequence_bounds()
-        print("".join("...." * depth) + f"Upper bound: {upper_bound.samples}")
-        print("".join("...." * depth) + f"Lower bound: {lower_bound.samples}")
         if upper_bound is None or lower_bound is None or upper_bound.samples == lower_bound.samples:
-            print("".join("...." * depth) + f"could not generate bounds")
-            return []
+            logger.debug("%scould not generate bounds", "...." * depth)
+            return None
+        logger.debug("%sUpper bound: %s", "...." * depth, upper_bound.samples)
+        logger.debug("%sLower bound: %s", "...." * depth, lower_bound.samples)
+        return btn_1_bounded_sequence_generator(upper_bound, lower_bound, points_per_stride)
 
-        found_solutions: List[HybridResult] = []        
-        gen = btn_1_bounded_sequence_generator(upper_bound, lower_bound, points_per_stride)
-        for input_sequence in gen:
-            self.model.input_sequence = input_sequence
-            solver = HyEQSolver(self.model)
-            solution = solver.solve()
-            if not solution:
-                return []
-            # NOTE: time on these solutions is fucky-wucky
-            # .     basically: because we're going back in steps
-            #       we have no idea where the first time point is
-            #       but we always solve "forward" in time
-            # ok, so our hybrid result is in the correct direction, but the times are gonna be
-            # backwards, so we remap them.
-            last_solve_state = solution[-1].state
-            max_solve_time = solution[-1].time
-            max_solve_jumps = solution[-1].jumps
-            for idx, new_time, new_jumps in zip(
-                [i for i in range(0, len(solution))],
-                [abs(max_solve_time - point.time) for point in solution],
-                [abs(max_solve_jumps - point.jumps) for point in solution]):
-                    solution[idx].time = new_time
-                    solution[idx].jumps = new_jumps
-            found_solutions.append(HybridResult(not solver.stop, input_sequence, solution))
-            # FIXME this sucks, memorizing around a function call sucks
-            #       there has got to be a better way to set up this recursion
-            restore_state = self.model.start_state
-            print("".join("...." * depth) + f"going deeper")
-            found_solutions += self.feasibility_set(last_solve_state, goal_x_pos, points_per_stride, depth)
-            self.model.start_state = restore_state
+    def feasibility_batched(self, start_state:FlappyState, goal_x_pos, points_per_stride, fixed_step: bool = False) -> List[HybridResult]:
+        """ Breadth first take on feasibility_set. Instead of recursing down one branch at a time,
+            every state a stride ends at goes into one (n_states, state_dim) frontier array, and the
+            whole frontier gets worked through one stride at a time. Any state that more than one
+            branch lands on only gets expanded once
+            NOTE: only fixed_step actually solves a stride as one batch (one kernel call over every
+                  sequence from every frontier state). Without it, each input sequence still goes
+                  through HyEQSolver one at a time, so that's the same solves as feasibility_set,
+                  just in a different order and minus the duplicate states
+        Args:
+            start_state (FlappyState): the state to start feasibility finding at
+            goal_x_pos (float): the x position we want to eventually get to
+            points_per_stride (int): number of valid solutions to use per backwards stride
+                                     -1 for all of them
+            fixed_step (bool): run every input sequence in a stride through one batch_solve call,
+                               instead of HyEQSolver one at a time. Bounds still use the solver,
+                               one frontier state at a time either way
+        Returns:
+            List: a list of hybrid results for every stride that got simulated, in stride order
+        """
+        restore_state = self.model.start_state
+        found_solutions: List[HybridResult] = []
+        frontier = start_state.to_array()[np.newaxis, :]
+        depth = 0
+        while frontier.shape[0] > 0:
+            # dedupe, then drop anything that's already made it to the goal
+            frontier = np.unique(frontier, axis=0)
+            frontier = frontier[frontier[:, 0] > goal_x_pos]
+            logger.debug("stride %d: %d states to expand", depth, frontier.shape[0])
+            next_frontier = []
+            # fixed step only: every (start state, input sequence) pair in this stride
+            stride_starts = []
+            stride_samples: List[np.ndarray] = []
+            stride_times: List[float] = []
+            for row in frontier:
+                self.model.start_state = FlappyState(row)
+                upper_bound, lower_bound = self._get_input_sequence_bounds()
+                if upper_bound is None or lower_bound is None or upper_bound.samples == lower_bound.samples:
+                    # nowhere to go from here
+                    continue
+                if fixed_step:
+                    row_samples = btn_1_bounded_sequence_array(upper_bound, lower_bound, points_per_stride)
+                    stride_starts.append(np.broadcast_to(row, (row_samples.shape[0], row.size)))
+                    stride_samples.append(row_samples)
+                    # every bound comes out of the same ordered generator, so these all match
+                    stride_times = upper_bound.times
+                    continue
+                for input_sequence in btn_1_bounded_sequence_generator(upper_bound, lower_bound, points_per_stride):
+                    solution, stop = self._solve(input_sequence)
+                    if not solution:
+                        break
+                    next_frontier.append(solution[-1].state.to_array())
+                    reverse_time_and_jumps(solution)
+                    found_solutions.append(HybridResult(not stop, input_sequence, solution))
+            if stride_samples:
+                # siblings are independent, so the whole stride runs in parallel in one kernel call
+                stride_results = self.batch_solve_samples(
+                    np.concatenate(stride_samples), stride_times, start_states=np.concatenate(stride_starts)
+                )
+                for result in stride_results:
+                    # the remap only touches time and jumps, the last point is still where the run ended
+                    next_frontier.append(result.sim_result[-1].state.to_array())
+                    found_solutions.append(result)
+            frontier = np.array(next_frontier).reshape(-1, frontier.shape[1])
+            depth += 1
 
+        self.model.start_state = restore_state
         return found_solutions
 
-    def _plot_bounds_recursively(self, start_state, goal_x_pos, points_per_stride) -> List[HybridResult]:
-        """ Utility function to plot just the bounds of a backwards flappy solution
+    def _batch_kernel_input_args(self, samples: np.ndarray, times: np.ndarray) -> tuple:
+        """ The backwards kernel also needs to know when each fall started, see BatchSolveMixin
+        Args:
+            samples (np.ndarray): see BatchSolveMixin._batch_solve
+            times (np.ndarray): see BatchSolveMixin._batch_solve
+        Returns:
+            tuple: (n_sequences, n_samples) fall start time for each sample
+        """
+        # for each sample, when the run of 0s it's in started: the sample after the last press
+        # at or before it. Only matters for 0 samples, see reverse_y_vel_from_signal
+        sample_idxs = np.arange(times.size)
+        last_press = np.maximum.accumulate(np.where(samples != 0, sample_idxs, -1), axis=1)
+        return (times[np.minimum(last_press + 1, times.size - 1)],)
+
+    def _batch_times_and_jumps(self, step_times: np.ndarray, jumps: np.ndarray) -> Tuple[List[float], List[int]]:
+        """ Same remap as reverse_time_and_jumps, but times and jumps are already arrays here,
+            so it's a couple of array ops before building any points. See BatchSolveMixin
+        Args:
+            step_times (np.ndarray): see BatchSolveMixin._batch_times_and_jumps
+            jumps (np.ndarray): see BatchSolveMixin._batch_times_and_jumps
+        Returns:
+            Tuple[List[float], List[int]]: times and jumps counted from the other end
+        """
+        return (step_times[-1] - step_times).tolist(), (jumps[-1] - jumps).tolist()
+
+    def _plot_bounds_recursively(self, start_state, goal_x_pos, points_per_stride, found_bounds: Optional[List[HybridResult]] = None) -> List[HybridResult]:
+        """ Utility function to plot just the bounds of a backwards flappy solution. Every level
+            appends to the same found_bounds list, rather than handing a new list back up to be
+            copied into its parent's
         """
         # FIXME DELETE EVENTUALLY
+        if found_bounds is None:
+            found_bounds = []
+        # so a dead end can throw out just what this level added
+        level_start = len(found_bounds)
         self.model.start_state = start_state
 
         if self.model.start_state.x_pos <= goal_x_pos:
             #print(f"... found a good solution!")
-            return []
+            return found_bounds
 
         upper_solutions, lower_solutions = self._plot_input_sequence_bounds()
         upper_bound = [solution for solution in upper_solutions if solution.successful == True]
         lower_bound = [solution for solution in lower_solutions if solution.successful == True]
         
         if not upper_bound or not lower_bound:
-            return []
+            return found_bounds
 
         # jankerific unpack operation        
-        found_bounds:List[HybridResult] = [upper_bound[0], lower_bound[0]]
+        found_bounds.append(upper_bound[0])
+        found_bounds.append(lower_bound[0])
         upper_bound_input = upper_bound[0].input_sequence         
         lower_bound_input = lower_bound[0].input_sequence
-        print(f"Create a sequence generator from {upper_bound_input.samples} --> {lower_bound_input.samples}")
+        logger.debug("Create a sequence generator from %s --> %s", upper_bound_input.samples, lower_bound_input.samples) #type: ignore it'll be there
         gen = btn_1_bounded_sequence_generator(upper_bound_input, lower_bound_input, points_per_stride) #type: ignore it'll be there
         for input_sequence in gen:
-            self.model.input_sequence = input_sequence
             #print(f"Model start state while finding points: {self.model.start_state}")
-            solver = HyEQSolver(self.model)
-            solution = solver.solve()
+            self._solver.reset(input_sequence)
+            solution = self._solver.solve()
             if not solution:
-                return []
+                del found_bounds[level_start:]
+                return found_bounds
             
             last_solve_state = solution[-1].state
             restore_state = self.model.start_state
-            found_bounds += self._plot_bounds_recursively(last_solve_state, goal_x_pos, points_per_stride)
+            self._plot_bounds_recursively(last_solve_state, goal_x_pos, points_per_stride, found_bounds)
             self.model.start_state = restore_state
 
         return found_bounds
@@ -190,7 +395,7 @@ class FeasibilityFlappySim(HybridSim[BackwardsFlappyModel]):
             self.t_max, self.step_time, "dsc"
         )
         upper_solutions = self._find_reachability_bound_given_order(upper_input_gen)
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>")
+        logger.debug(">>>>>>>>>>>>>>>>>>>>>>>>>>>")
         # lower bound calc
         lower_input_gen = btn_1_ordered_sequence_generator(
             self.t_max, self.step_time, "asc"
@@ -208,28 +413,26 @@ class FeasibilityFlappySim(HybridSim[BackwardsFlappyModel]):
         # this algorithm only makes sense for models with an input sequence
         if not hasattr(self.model, 'input_sequence'):
             raise RuntimeError("Provided model does not have an input sequence")
-    
         while not done:
             # get an input sequence if we haven't gotten one yet
             if not input_sequence:
                 input_sequence = input_generator.send(
                     None
                 )  # explicit about getting the first element from the generator
-            self.model.input_sequence = input_sequence #type: ignore models that make it this far have input sequences
-            print(
-                f"Simulating: {''.join([str(sample) for sample in self.model.input_sequence.samples])}" #type: ignore models that make it this far have input sequences
-            )
-            solver = HyEQSolver(self.model)
-            solution = solver.solve()
+            if logger.isEnabledFor(logging.DEBUG):
+                # joining the samples isn't free, skip it when nobody's listening
+                logger.debug("Simulating: %s", "".join([str(sample) for sample in input_sequence.samples]))
+            # NOTE: _solve hands the sequence to the model itself, and only on a cache miss. Setting
+            #       it here too would rebuild the model's sample arrays for nothing
+            solution, stop = self._solve(input_sequence)
             if not solution:
-                print("Got a completely blank solution from the solver")
-                print("May mean an invalid start state?")
+                logger.debug("Got a completely blank solution from the solver. May mean an invalid start state?")
                 # solution is the empty array. I think this means that we shouldn't
                 # even try other input sequences?
                 done = True
                 # the solution is just a single failed point at the start state
                 solutions.append(HybridResult(False, input_sequence, [HybridPoint(0.0, self.model.start_state, 0)]))
-            elif solver.stop == True:
+            elif stop == True:
                 # normal failed run path
                 solutions.append(HybridResult(False, input_sequence, solution))
                 try:
@@ -238,46 +441,52 @@ class FeasibilityFlappySim(HybridSim[BackwardsFlappyModel]):
                     # We're in a state where we can't actually keep going-- we're invalid, there's
                     # no input sequence that we can take to get out of this one
                     done = True
-            elif solver.stop == False:
+            elif stop == False:
                 # This is the upper bound
                 solutions.append(HybridResult(True, input_sequence, solution))
                 done = True
-            #if not done:
-            #    print(
-            #        f"Time spent solving: {solve_stop_time - single_run_start:0.02f}s"
-            #    )
-        if solutions and solutions[-1].successful == True:
-            pass
-            #print("...Valid solution found!")
-            #print(f"{solutions[-1].input_sequence.samples}")  # type:ignore
         return solutions
 
 
     def _get_input_sequence_bounds(self) -> Tuple[Optional[InputSignal], Optional[InputSignal]]:
-        """ Get upper and lower bounds on an input sequence for flappers
+        """ Get upper and lower bounds on an input sequence for flappers. Each bound is a whole
+            generator's worth of solves, and the search only depends on the model's start state
+            (plus t_max, j_max and step_time, which go in the key in case someone changes them),
+            so we only ever search once per start state. Dropped along with _solve_cache if the
+            level changes
+        """
+        self._check_cache_level()
+        key = (self.t_max, self.j_max, self.model.start_state.to_array().tobytes(), self.step_time)
+        bounds = self._bounds_cache.get(key)
+        if bounds is None:
+            # NOTE: bounded generators only read these, so it's fine to hand the same ones out again
+            bounds = self._search_input_sequence_bounds()
+            if len(self._bounds_cache) >= self.BOUNDS_CACHE_SIZE:
+                # same as _solve, dicts keep insertion order so this drops the oldest
+                del self._bounds_cache[next(iter(self._bounds_cache))]
+            self._bounds_cache[key] = bounds
+        return bounds
+
+    def _search_input_sequence_bounds(self) -> Tuple[Optional[InputSignal], Optional[InputSignal]]:
+        """ The actual bounds search behind _get_input_sequence_bounds
         """
         upper_input_gen = btn_1_ordered_sequence_generator(
             self.t_max, self.step_time, "dsc"
         )
         upper_solutions = self._find_reachability_bound_given_order(upper_input_gen)
-        upper_bound = [solution for solution in upper_solutions if solution.successful == True]
-        # FIXME jankerific unpack
-        if len(upper_bound) > 0:
-            upper_bound = upper_bound[0]
-        else:
-            print("Unable to find an upper bound, returning an empty set")
+        upper_bound = next((solution for solution in upper_solutions if solution.successful), None)
+        if upper_bound is None:
+            # no point searching for a lower bound without an upper one
+            logger.debug("Unable to find an upper bound, returning an empty set")
             return None, None
 
         lower_input_gen = btn_1_ordered_sequence_generator(
             self.t_max, self.step_time, "asc"
         )
         lower_solutions = self._find_reachability_bound_given_order(lower_input_gen)
-        lower_bound = [solution for solution in lower_solutions if solution.successful == True]
-        # FIXME jankerific unpack
-        if len(lower_bound) > 0:
-            lower_bound = lower_bound[0]
-        else:
-            print("Unable to find a lower bound, returning an empty set")
+        lower_bound = next((solution for solution in lower_solutions if solution.successful), None)
+        if lower_bound is None:
+            logger.debug("Unable to find a lower bound, returning an empty set")
             return None, None
  
         return upper_bound.input_sequence, lower_bound.input_sequence
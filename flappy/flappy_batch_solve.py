@@ -0,0 +1,150 @@
+""" Fixed step batch solving, shared by both flappy sims. The compiled kernels differ by direction
+    (see each direction's flappy_kernels), but building their inputs and turning what they
+    write back into HybridResults is the same either way
+"""
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from hybrid_models.hybrid_point import HybridPoint
+from hybrid_models.hybrid_result import HybridResult
+from input.input_signal import InputSignal
+from .flappy_state import FlappyState
+
+
+class BatchSolveMixin:
+    """Adds batch_solve to a flappy sim. Expects the sim to have model (with level and
+       system_params), t_max and j_max, and to set _batch_solve_kernel to its direction's
+       batch_solve_kernel
+    """
+    _batch_solve_kernel: Callable
+
+    def batch_solve(self, sequences: List[InputSignal], dt: float = 0.01, start_states: Optional[np.ndarray] = None) -> List[HybridResult]:
+        """ Solve every input sequence in one go. Unlike single_run
+            this doesn't go through HyEQSolver: it's one compiled fixed step loop that runs the
+            sequences in parallel, so jumps land on the first step boundary after the input
+            changes rather than at the exact time
+        Args:
+            sequences (List[InputSignal]): input sequences to solve. They all need the same sample times
+            dt (float): step size. Defaults to the solver's max step. The last step gets cut
+                        short so runs stop at t_max
+            start_states (Optional[np.ndarray]): (n_sequences, 4) state for each sequence to start from.
+                                                 Every sequence starts from the model's start state
+                                                 if not provided
+        Returns:
+            List[HybridResult]: one result per sequence, in the same order, with time and jumps
+                                the same way single_run's are
+        """
+        if not sequences:
+            return []
+        times = np.asarray(sequences[0].times, dtype=np.float64)
+        if any(not np.array_equal(sequence.times, times) for sequence in sequences):
+            raise ValueError("Every input sequence in a batch needs the same sample times!")
+        samples = np.array([sequence.samples for sequence in sequences], dtype=np.float64)
+        return self._batch_solve(samples, times, sequences, dt, start_states)
+
+    def batch_solve_samples(self, samples: np.ndarray, times: List[float], dt: float = 0.01, start_states: Optional[np.ndarray] = None) -> List[HybridResult]:
+        """ Same as batch_solve, but with the input sequences as the rows of one array, e.g. from
+            btn_1_bounded_sequence_array. InputSignals only get built for the results
+        Args:
+            samples (np.ndarray): (n_sequences, n_samples) button values, one row per sequence
+            times (List[float]): sample times, shared by every sequence
+            dt (float): see batch_solve
+            start_states (Optional[np.ndarray]): see batch_solve
+        Returns:
+            List[HybridResult]: see batch_solve
+        """
+        samples = np.asarray(samples)
+        if samples.shape[0] == 0:
+            return []
+        if samples.shape[1] != len(times):
+            raise ValueError("Every input sequence in a batch needs the same sample times!")
+        sequences = [InputSignal(row, times) for row in samples.tolist()]
+        # contiguous float64 either way, so the kernel only ever compiles the one version
+        return self._batch_solve(np.ascontiguousarray(samples, dtype=np.float64), np.ascontiguousarray(times, dtype=np.float64), sequences, dt, start_states)
+
+    def _batch_kernel_input_args(self, samples: np.ndarray, times: np.ndarray) -> tuple:
+        """ Anything this direction's kernel needs about the input, past samples and times.
+            Goes in right after times
+        Args:
+            samples (np.ndarray): see _batch_solve
+            times (np.ndarray): see _batch_solve
+        Returns:
+            tuple: extra kernel arguments, none by default
+        """
+        return ()
+
+    def _batch_times_and_jumps(self, step_times: np.ndarray, jumps: np.ndarray) -> Tuple[List[float], List[int]]:
+        """ Time and jumps for each point of one sequence's run, as the results should report them
+        Args:
+            step_times (np.ndarray): time of each step the sequence took, in solve order
+            jumps (np.ndarray): jump count at each of those steps
+        Returns:
+            Tuple[List[float], List[int]]: times and jumps, as they are by default
+        """
+        return step_times.tolist(), jumps.tolist()
+
+    def _batch_solve(self, samples: np.ndarray, times: np.ndarray, sequences: List[InputSignal], dt: float, start_states: Optional[np.ndarray]) -> List[HybridResult]:
+        """ Shared guts of batch_solve and batch_solve_samples
+        Args:
+            samples (np.ndarray): (n_sequences, n_samples) float64 button values
+            times (np.ndarray): (n_samples,) float64 sample times
+            sequences (List[InputSignal]): the same sequences as samples, to hand back with the results
+            dt (float): see batch_solve
+            start_states (Optional[np.ndarray]): see batch_solve
+        Returns:
+            List[HybridResult]: see batch_solve
+        """
+        model = self.model  # type: ignore set up by the sim this gets mixed into
+        n_sequences = samples.shape[0]
+        if start_states is None:
+            start_states = np.tile(model.start_state.to_array(), (n_sequences, 1))
+        start_states = np.ascontiguousarray(start_states, dtype=np.float64).reshape(n_sequences, 4)
+        t_max = float(self.t_max)  # type: ignore
+        # rounded first, so t_max = 0.7, dt = 0.1 doesn't turn into 8 steps with a ~1e-16 last one
+        n_steps = int(np.ceil(round(t_max / dt, 9)))
+        trajectory = np.empty((n_sequences, n_steps + 1, 4), dtype=np.float64)
+        trajectory_jumps = np.empty((n_sequences, n_steps + 1), dtype=np.int64)
+        steps_taken = np.zeros(n_sequences, dtype=np.int64)
+        collided = np.zeros(n_sequences, dtype=np.bool_)
+        params = model.system_params
+        level = model.level
+        self._batch_solve_kernel(
+            start_states,
+            samples,
+            times,
+            *self._batch_kernel_input_args(samples, times),
+            dt,
+            n_steps,
+            t_max,
+            self.j_max,  # type: ignore
+            float(params.pressed_x_vel),
+            float(params.pressed_y_vel),
+            float(params.gamma),
+            level.x_lo,
+            level.x_hi,
+            level.y_lo,
+            level.y_hi,
+            level.max_obstacle_width,
+            float(level.lower_bound),
+            float(level.upper_bound),
+            trajectory,
+            trajectory_jumps,
+            steps_taken,
+            collided
+        )
+
+        step_times = np.arange(n_steps + 1) * dt
+        # the kernel cuts the last step short so it lands on t_max
+        step_times[-1] = t_max
+        results = []
+        for seq_idx, input_sequence in enumerate(sequences):
+            last_step = steps_taken[seq_idx]
+            point_times, point_jumps = self._batch_times_and_jumps(
+                step_times[:last_step + 1], trajectory_jumps[seq_idx, :last_step + 1]
+            )
+            solution = [
+                # trajectory is ours alone, so states can just be views into it
+                HybridPoint(point_time, FlappyState.from_array(trajectory[seq_idx], step), point_jump)
+                for step, (point_time, point_jump) in enumerate(zip(point_times, point_jumps))
+            ]
+            results.append(HybridResult(not collided[seq_idx], input_sequence, solution))
+        return results
@@ -0,0 +1,35 @@
+""" Kernels shared by both flappy directions. Collision only cares where the bird is, not which
+    way time is going, so forwards and backwards models both check against the level with this.
+    Signatures are spelled out so Numba compiles (or loads from its cache) at import.
+"""
+import numpy as np
+from hybrid_models.jit import njit
+
+
+@njit(
+    "boolean(float64, float64, float64[::1], float64[::1], float64[::1], float64[::1], float64, float64, float64)",
+    cache=True
+)
+def collision_kernel(
+    x_pos: float,
+    y_pos: float,
+    x_lo: np.ndarray,
+    x_hi: np.ndarray,
+    y_lo: np.ndarray,
+    y_hi: np.ndarray,
+    max_obstacle_width: float,
+    lower_bound: float,
+    upper_bound: float
+) -> bool:
+    """True if the bird is out of the level's y bounds or inside an obstacle. Obstacle edge
+       arrays need to be sorted by x_lo (FlappyLevel does this), so we only check the window
+       of obstacles whose left edge is within max_obstacle_width of the bird
+    """
+    if y_pos <= lower_bound or y_pos >= upper_bound:
+        return True
+    first_idx = np.searchsorted(x_lo, x_pos - max_obstacle_width, side="left")
+    last_idx = np.searchsorted(x_lo, x_pos, side="right")
+    for idx in range(first_idx, last_idx):
+        if x_pos <= x_hi[idx] and y_pos >= y_lo[idx] and y_pos <= y_hi[idx]:
+            return True
+    return False
@@ -1,9 +1,11 @@
 """ Object for handling ye flappy level. A flappy level is just a few rectangular blocks
     and two limits on y position
 """
-import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import List, Tuple, Optional
+import zipfile
+import numpy as np
 
 
 @dataclass
@@ -19,6 +21,9 @@ class FlappyLevel:
         pipe_width (Optional[float]): for procedural gen, how wide should the pipes be
         gap (Optional[float]): for procedural gen, how big should the vertical gap between pipes be
         seed (Optional[int]): for procedural gen, generation seed
+        x_lo, x_hi, y_lo, y_hi (np.ndarray): obstacle edges as flat arrays, sorted by x_lo.
+                                             Built from obstacles, for the collision broad phase
+        max_obstacle_width (float): widest obstacle, so we know how far left of the bird to look
     """
 
     obstacles: List[Tuple[Tuple[float, float], Tuple[float, float]]]
@@ -27,12 +32,31 @@ class FlappyLevel:
     pipe_width: Optional[float] = None
     gap: Optional[float] = None
     seed: Optional[int] = None
+    x_lo: np.ndarray = field(init=False, repr=False, compare=False)
+    x_hi: np.ndarray = field(init=False, repr=False, compare=False)
+    y_lo: np.ndarray = field(init=False, repr=False, compare=False)
+    y_hi: np.ndarray = field(init=False, repr=False, compare=False)
+    max_obstacle_width: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Flatten obstacles out into sorted edge arrays, once per level.
+           NOTE: if you change obstacles after making the level, these go stale
+        """
+        # NOTE: float64 on purpose. These get compared against float64 solver states right at
+        #       obstacle edges, and float32 edges (1.7 -> 1.70000005) would move collisions around.
+        #       With a handful of obstacles in the window, there's no bandwidth to save anyway
+        bounds = np.array(self.obstacles, dtype=np.float64).reshape(-1, 4)
+        bounds = bounds[np.argsort(bounds[:, 0], kind="stable")]
+        self.x_lo, self.y_lo, self.x_hi, self.y_hi = (np.ascontiguousarray(col) for col in bounds.T)
+        self.max_obstacle_width = float((self.x_hi - self.x_lo).max()) if bounds.shape[0] else 0.0
 
     @classmethod
-    def simple_procedural_gen(cls, seed: Optional[int]):
+    def simple_procedural_gen(cls, seed: Optional[int], rng: Optional[np.random.Generator] = None):
         """run a simple procedure for making a sample flappy bird level
         Args:
             seed (Optional[int]): generation seed
+            rng (Optional[np.random.Generator]): generator to draw from. If not provided,
+                                                 we make one from seed
         Returns:
             FlappyLevel: a new level to use
         """
@@ -46,10 +70,16 @@ class FlappyLevel:
         gap: float = 1.0
         num_gaps: int = 6  # total pipes placed is 2x this number
 
+        if rng is None:
+            rng = np.random.default_rng(seed)
+        # NOTE: one draw of num_gaps integers comes out of the generator exactly the same as
+        #       num_gaps single draws, so levels (and cached_procedural_gen's files) don't change.
+        #       It's the generator calls that cost here, a dozen tuples is nothing
+        height_idxs = rng.integers(len(heights), size=num_gaps).tolist()
         pipes = []
-        for i in range(num_gaps):
+        for i, height_idx in enumerate(height_idxs):
             left_base = x_start + x_period * i
-            bottom_height = random.choice(heights)
+            bottom_height = heights[height_idx]
             top_start = gap + bottom_height
             # lower pipe
             pipes.append(
@@ -62,6 +92,58 @@ class FlappyLevel:
 
         return FlappyLevel(pipes, 5.0, 0.0, pipe_width, gap, seed=seed)
 
+    @classmethod
+    def cached_procedural_gen(cls, seed: int, cache_dir: Optional[Path] = None):
+        """simple_procedural_gen, but the level gets saved to an .npz in cache_dir the first time
+           and loaded from there after that. Levels only depend on the seed, so that's the key
+           NOTE: bump the version in the file name if simple_procedural_gen changes!
+           The cache is only ever a shortcut: if it can't be read or written (no home dir,
+           read only disk, a truncated file from a killed run) we just generate the level
+        Args:
+            seed (int): generation seed
+            cache_dir (Optional[Path]): directory to keep cached levels in. ~/.cache/hyeq if not provided
+        Returns:
+            FlappyLevel: the level for this seed
+        """
+        if cache_dir is None:
+            try:
+                cache_dir = Path.home() / ".cache" / "hyeq"
+            except RuntimeError:
+                # no home dir to speak of
+                return cls.simple_procedural_gen(seed)
+        cache_path = cache_dir / f"level_v1_{seed}.npz"
+        try:
+            with np.load(cache_path) as cached:
+                obstacles = [
+                    ((left, bottom), (right, top)) for left, bottom, right, top in cached["obstacles"].tolist()
+                ]
+                return FlappyLevel(
+                    obstacles,
+                    float(cached["upper_bound"]),
+                    float(cached["lower_bound"]),
+                    float(cached["pipe_width"]),
+                    float(cached["gap"]),
+                    seed=seed
+                )
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            # not cached yet, or whatever's there isn't a level we can use. Regenerate (and overwrite)
+            pass
+
+        level = cls.simple_procedural_gen(seed)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                cache_path,
+                obstacles=np.array(level.obstacles, dtype=np.float64).reshape(-1, 4),
+                upper_bound=level.upper_bound,
+                lower_bound=level.lower_bound,
+                pipe_width=level.pipe_width,
+                gap=level.gap,
+            )
+        except OSError:
+            pass
+        return level
+
     @classmethod
     def scripted_gen_level(cls):
         """A function to edit to generate a very particular level to test
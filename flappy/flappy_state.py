@@ -1,7 +1,9 @@
 """ Flappy state! As a list serializable class
 """
 from dataclasses import dataclass
-from typing import List, Any, Union, Iterator
+from typing import List, Any, Union, Iterator, Optional
+from numpy import array, float64, ndarray
+from numpy.typing import ArrayLike
 from hybrid_models.ndarray_dataclass import NDArrayBacked
 from collections.abc import Sequence
 
@@ -14,6 +16,15 @@ class FlappyState(NDArrayBacked[float | int]):
                        x_vel is constant and doesn't need to be part of state.
         pressed (int): if the button is pressed or not
     """
+    __slots__ = ()
+
+    def __init__(self, data:ArrayLike):
+        # always a 4 slot float64 array, whatever we got handed (json can give us ints).
+        # pressed rides along as a float, same as it does through solve_ivp
+        self._data = array(data, dtype=float64)
+
+    def __len__(self) -> int:
+        return 4
 
     @property
     def x_pos(self) -> float:
@@ -49,4 +60,14 @@ class FlappyState(NDArrayBacked[float | int]):
 
     @classmethod
     def from_properties(cls, x_pos:float, y_pos:float, y_vel:float, pressed:int):
-        return cls([x_pos, y_pos, y_vel, pressed])
\ No newline at end of file
+        return cls([x_pos, y_pos, y_vel, pressed])
+
+    @classmethod
+    def from_array(cls, data:ndarray, idx:Optional[int] = None):
+        """Wrap an existing float64 array as a state without copying it. Give idx to wrap row
+           idx of an (n_states, 4) trajectory, so a whole solution can live in one array.
+           NOTE: writes through the state land in data, and the other way around
+        """
+        state = cls.__new__(cls)
+        state._data = data if idx is None else data[idx]
+        return state
\ No newline at end of file
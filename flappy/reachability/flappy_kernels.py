@@ -0,0 +1,106 @@
+""" Arithmetic kernels for the forwards-in-time flappy bird. These get called once per
+    integrator substep, so they take plain floats rather than FlappyState/FlappyParams objects,
+    which lets Numba compile them. Collision checks use the shared kernel in flappy.flappy_kernels.
+    Signatures are spelled out so Numba compiles (or loads from its cache) at import, rather
+    than stalling the first solver call. The batched driver at the bottom is the exception:
+    it only gets used for fixed step runs, so it compiles on first use (cli's _warm_jit
+    fills Numba's cache for it) instead of making every import pay for a parallel compile.
+"""
+from typing import Tuple
+import numpy as np
+from hybrid_models.jit import njit, prange
+from ..flappy_kernels import collision_kernel
+
+
+@njit("UniTuple(float64, 3)(float64, float64, float64, float64)", cache=True, fastmath=True)
+def falling_flow_kernel(y_vel: float, pressed_x_vel: float, pressed_y_vel: float, gamma: float) -> Tuple[float, float, float]:
+    """d[x_pos]/dt, d[y_pos]/dt and d[y_vel]/dt while falling (pressed == 0)"""
+    return pressed_x_vel, y_vel, -gamma
+
+@njit("UniTuple(float64, 3)(float64, float64, float64, float64)", cache=True, fastmath=True)
+def flapping_flow_kernel(y_vel: float, pressed_x_vel: float, pressed_y_vel: float, gamma: float) -> Tuple[float, float, float]:
+    """d[x_pos]/dt, d[y_pos]/dt and d[y_vel]/dt while flapping (pressed == 1).
+       Same arguments as falling_flow_kernel so the model can pick either one by pressed"""
+    return pressed_x_vel, pressed_y_vel, 0.0
+
+@njit(cache=True, parallel=True)
+def batch_solve_kernel(
+    start_states,
+    samples,
+    times,
+    dt,
+    n_steps,
+    t_max,
+    j_max,
+    pressed_x_vel,
+    pressed_y_vel,
+    gamma,
+    x_lo,
+    x_hi,
+    y_lo,
+    y_hi,
+    max_obstacle_width,
+    lower_bound,
+    upper_bound,
+    trajectory,
+    trajectory_jumps,
+    steps_taken,
+    collided
+):
+    """Fixed step forwards flappy, one input sequence per prange iteration. Flow is solved
+       exactly over each step, and input only gets looked at on step boundaries.
+    Args:
+        start_states (ndarray): (n_sequences, 4) x_pos, y_pos, y_vel, pressed each sequence starts from
+        samples (ndarray): (n_sequences, n_samples) button values, one row per sequence
+        times (ndarray): (n_samples,) sample times, shared by every sequence
+        dt (float): step size
+        n_steps (int): max number of steps to take
+        t_max (float): when to stop. The last step gets cut short to land on it exactly
+        j_max (int): max number of jumps
+        pressed_x_vel, pressed_y_vel, gamma (float): FlappyParams, unpacked
+        x_lo, x_hi, y_lo, y_hi, max_obstacle_width, lower_bound, upper_bound: the level, see
+                                                                          collision_kernel
+        trajectory (ndarray): (n_sequences, n_steps + 1, 4) states, written per step
+        trajectory_jumps (ndarray): (n_sequences, n_steps + 1) jump counts, written per step
+        steps_taken (ndarray): (n_sequences,) last step written for each sequence
+        collided (ndarray): (n_sequences,) bool, True if that sequence hit something
+    """
+    for seq_idx in prange(samples.shape[0]):
+        x_pos = start_states[seq_idx, 0]
+        y_pos = start_states[seq_idx, 1]
+        y_vel = start_states[seq_idx, 2]
+        pressed = start_states[seq_idx, 3]
+        jumps = 0
+        for step in range(n_steps + 1):
+            if step > 0:
+                # flow, exactly
+                step_dt = dt if step < n_steps else t_max - (n_steps - 1) * dt
+                x_pos += pressed_x_vel * step_dt
+                if pressed == 0:  # falling
+                    y_pos += y_vel * step_dt - 0.5 * gamma * step_dt * step_dt
+                    y_vel -= gamma * step_dt
+                else:  # flapping
+                    y_pos += pressed_y_vel * step_dt
+            hit = collision_kernel(x_pos, y_pos, x_lo, x_hi, y_lo, y_hi, max_obstacle_width, lower_bound, upper_bound)
+            if not hit and jumps < j_max:
+                time = step * dt if step < n_steps else t_max
+                # same lookup as ForwardFlappyModel.get_input: closest sample at or before now
+                sample_idx = np.searchsorted(times, time, side="right") - 1
+                new_pressed = samples[seq_idx, max(sample_idx, 0)]
+                if new_pressed != pressed:
+                    pressed = new_pressed
+                    if new_pressed == 1:
+                        y_vel = pressed_y_vel
+                    jumps += 1
+            # record after jumping, so a start state that jumps right away matches the solver
+            trajectory[seq_idx, step, 0] = x_pos
+            trajectory[seq_idx, step, 1] = y_pos
+            trajectory[seq_idx, step, 2] = y_vel
+            trajectory[seq_idx, step, 3] = pressed
+            trajectory_jumps[seq_idx, step] = jumps
+            steps_taken[seq_idx] = step
+            if hit:
+                collided[seq_idx] = True
+                break
+            if jumps >= j_max:
+                break
@@ -1,12 +1,17 @@
 """ Hybrid model for flappy bird
 """
+import bisect
 from typing import List, Tuple
+from numpy import ndarray
 from hybrid_models.hybrid_model import HybridModel
+from hybrid_models.jit import pick_backend
 from hybrid_models.hybrid_point import HybridPoint
 from input.input_signal import InputSignal
 from ..flappy_state import FlappyState
 from ..flappy_params import FlappyParams
 from ..flappy_level import FlappyLevel
+from ..flappy_kernels import collision_kernel
+from .flappy_kernels import falling_flow_kernel, flapping_flow_kernel
 
 
 class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
@@ -16,10 +21,12 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
     Attributes:
         start_state (FlappyState): Flappy's start state
         system_params (FlappyParams): constants for simulating flappy
-        level (FlappyLevel): Level to simulate for Flappy
+        level (FlappyLevel): Level to simulate for Flappy. Setting this also caches what
+                             check_collisions needs from it
         t_max (float): max time to simulate out to
         j_max (int): max number of jumps to simulate out to
-        input_sequence (InputSignal): the input sequence to use for simulation
+        input_sequence (InputSignal): the input sequence to use for simulation. Setting this
+                                      also caches what get_input needs from it
     """
 
     start_state: FlappyState
@@ -36,16 +43,61 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
         t_max: float = 2.0,
         j_max: int = 8,
         input_sequence: InputSignal = InputSignal([], []), #type:ignore dataclass not getting picked up right within typechecker
+        backend: str = "numba",
     ):
-        """Constructor"""
+        """Constructor. backend picks compiled (numba) or plain python kernels"""
         super().__init__()
-        self.input_sequence: InputSignal = input_sequence
+        self.input_sequence = input_sequence
         self.j_max = j_max
         self.t_max = t_max
         self.start_state = start_state
         self.system_params = system_params
         self.state_factory = FlappyState
         self.level = level
+        # params are constant, so pull out what the hot path needs as plain floats once
+        self._pressed_x_vel = float(system_params.pressed_x_vel)
+        self._pressed_y_vel = float(system_params.pressed_y_vel)
+        self._gamma = float(system_params.gamma)
+        # indexed by pressed, so flow picks its kernel instead of branching on it
+        self._flow_kernels = (
+            pick_backend(falling_flow_kernel, backend),
+            pick_backend(flapping_flow_kernel, backend),
+        )
+        self._collision_kernel = pick_backend(collision_kernel, backend)
+
+    @property
+    def level(self) -> FlappyLevel:
+        return self._level
+
+    @level.setter
+    def level(self, level: FlappyLevel):
+        self._level = level
+        # everything collision_kernel wants from the level, in its argument order. Pulled out
+        # once here instead of seven attribute lookups (and two float()s) per collision check
+        self._collision_args = (
+            level.x_lo,
+            level.x_hi,
+            level.y_lo,
+            level.y_hi,
+            level.max_obstacle_width,
+            float(level.lower_bound),
+            float(level.upper_bound)
+        )
+
+    @property
+    def input_sequence(self) -> InputSignal:
+        return self._input_sequence
+
+    @input_sequence.setter
+    def input_sequence(self, input_sequence: InputSignal):
+        self._input_sequence = input_sequence
+        # cached once per input sequence rather than walked every time we need them. Samples
+        # can come in as an int8 array (cli) or a list, either way get_input wants plain ints
+        self._times = input_sequence.times
+        self._samples = [int(sample) for sample in input_sequence.samples]
+        # NOTE: InputSignal has no __len__/__bool__, so `not self.input_sequence` was always False.
+        #       This is the check that was meant
+        self._has_input = bool(input_sequence.times)
 
     def get_input(self, time: float, jumps: int) -> int:
         """ Sample the input signal for the value of input at the provided time, jumps
@@ -56,27 +108,19 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
         Returns:
            int: value if the input signal is pressed or not
         """
-        if not self.input_sequence:
+        if not self._has_input:
             raise RuntimeError("Need to set an input sequence before getting input!")
         
-        # input_sequence is sorted according to time
-        # FIXME: which means there is a better way to do this
-        best_value = None
-        best_time = float("inf")
-        # we want to find the closest sample to (time) without going over
+        # input_sequence is sorted according to time, so we can binary search for
+        # the closest sample to (time) without going over
         # i.e.: never use a future sample to figure out the current value
-        for sample_time, sample_value in self.input_sequence:
-            temporal_distance = time - sample_time
-            if temporal_distance < 0:
-                continue
-            if temporal_distance < best_time:
-                best_time = temporal_distance
-                best_value = sample_value
-
-        if best_value is None:
+        # NOTE: bisect on the plain list, not np.searchsorted. For one scalar lookup the numpy
+        #       call overhead costs more than the whole search
+        best_sample_idx = bisect.bisect_right(self._times, time) - 1
+        if best_sample_idx < 0:
             raise Exception("Unable to find a good sample!")
 
-        return int(best_value)
+        return self._samples[best_sample_idx]
 
     def check_collisions(self, state: FlappyState) -> bool:
         """ Check to see if we're colliding with anything. For flappy, this should
@@ -86,49 +130,29 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
         Returns:
             bool: True = collision, False = no collision
         """
-        # before we get into obstacles, do some simple "bird must be between these these two
-        # heights" checks
-        if state.y_pos <= self.level.lower_bound:
-            return True
-        if state.y_pos >= self.level.upper_bound:
-            return True
-
-        # very simple collision detection
-        for obstacle in self.level.obstacles:
-            bottom_left_coord, top_right_coord = obstacle
-            if (
-                state.x_pos >= bottom_left_coord[0]
-                and state.x_pos <= top_right_coord[0]
-                and state.y_pos >= bottom_left_coord[1]
-                and state.y_pos <= top_right_coord[1]
-            ):
-                return True
-
-        return False
-
-    def flow(self, hybrid_state: HybridPoint[FlappyState]) -> FlappyState:
+        x_pos, y_pos, _, _ = state.to_list()
+        return self._collision_kernel(x_pos, y_pos, *self._collision_args)
+
+    def flow(self, hybrid_state: HybridPoint[FlappyState]) -> ndarray:
         """Flow function! This should take in y and return dy/dt.
         Args:
             hybrid_state: (HybridPoint[FlappyState]): flappy's current state, along with
                                                       the current time and number of jumps
         Returns:
-            FlappyState: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
+            ndarray: d[state]/d[time]! The derivative of state w.r.t time given time, number of jumps and system params!
         """
-        state = hybrid_state.state
         # NOTE: we currently overwrite the state and return the same state back
         #       this works, even though it doesn't make any goddamn sense.
-        if state.pressed == 0:  # falling
-            state.x_pos = self.system_params.pressed_x_vel
-            state.y_pos = state.y_vel
-            state.y_vel = -self.system_params.gamma
-            state.pressed = 0
-            return state
-        else:  # flapping (pressed == 1)
-            state.x_pos = self.system_params.pressed_x_vel
-            state.y_pos = self.system_params.pressed_y_vel
-            state.y_vel = 0
-            state.pressed = 0
-            return state
+        #       (it's the solver's scratch copy of state, same deal as the backwards model)
+        #       Don't swap this for one buffer owned by the model: solve_ivp holds onto the
+        #       derivative we return as the next step's first stage, so it has to be fresh per call
+        data = hybrid_state.state.to_array()
+        data[0], data[1], data[2] = self._flow_kernels[int(data[3])](
+            data[2], self._pressed_x_vel, self._pressed_y_vel, self._gamma
+        )
+        # pressed never flows
+        data[3] = 0
+        return data
 
     def jump(self, hybrid_state: HybridPoint[FlappyState]) -> FlappyState:
         """Jump function! This should return a new state after a jump,
@@ -140,14 +164,14 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
             FlappyState: new state after the jump!
         """
         state = hybrid_state.state
-        time = hybrid_state.time
-        jumps = hybrid_state.jumps
+        # write through the backing array, same as flow, rather than the property setters
+        data = state.to_array()
         # sample input signal
-        new_pressed = self.get_input(time, jumps)
-        state.pressed = new_pressed
+        new_pressed = self.get_input(hybrid_state.time, hybrid_state.jumps)
+        data[3] = new_pressed
         # jump according to the new input signal
         if new_pressed == 1:
-            state.y_vel = self.system_params.pressed_y_vel
+            data[2] = self._pressed_y_vel
 
         return state
 
@@ -197,3 +221,25 @@ class ForwardFlappyModel(HybridModel[FlappyState, FlappyParams]):
         if new_pressed != state.pressed:
             return (1, False)
         return (0, False)
+
+    def combined_check(self, hybrid_state: HybridPoint[FlappyState]) -> Tuple[int, int, bool]:
+        """flow_check and jump_check in one go, with one collision check and one input lookup.
+           Flappy can only ever do one or the other: flow while input matches pressed, jump
+           the moment it doesn't
+        Args:
+            hybrid_state: (HybridPoint[FlappyState]): flappy's current state, along with
+                                                      the current time and number of jumps
+        Returns:
+            tuple of three elements:
+                int: 1 for flowin', 0 for not flowin'
+                int: 1 for jumpin', 0 for not jumpin'
+                bool: stop signal, if this is true we need to completely stop the model
+        """
+        state = hybrid_state.state
+        if self.check_collisions(state):
+            return (0, 0, True)
+
+        new_pressed = self.get_input(hybrid_state.time, hybrid_state.jumps)
+        if new_pressed != state.pressed:
+            return (0, 1, False)
+        return (1, 0, False)
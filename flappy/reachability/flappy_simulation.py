@@ -1,9 +1,16 @@
 """ Interfaces for doing reachability and feasibility analysis of flappy bird
 """
+import atexit
+import logging
+import os
 import time
-from copy import deepcopy
-from typing import List, Tuple, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Iterator, List, Tuple, Dict, Optional
+import numpy as np
 from .flappy_model import ForwardFlappyModel
+from .flappy_kernels import batch_solve_kernel
+from ..flappy_batch_solve import BatchSolveMixin
 from ..flappy_state import FlappyState
 from ..flappy_level import FlappyLevel
 from ..flappy_params import FlappyParams
@@ -12,8 +19,62 @@ from input.input_signal import InputSignal
 from hybrid_models.hybrid_solver import HyEQSolver
 from hybrid_models.hybrid_result import HybridResult
 from hybrid_models.hybrid_simulation import HybridSim
+from hybrid_models.jit import pick_backend
 
-class ReachabilityFlappySim(HybridSim[ForwardFlappyModel]):
+logger = logging.getLogger(__name__)
+
+# worker processes for reachability_simulation(parallel=True), kept around between calls. See _get_pool
+_POOL: Optional[ProcessPoolExecutor] = None
+
+def _init_worker() -> None:
+    """ProcessPoolExecutor initializer. Spawned workers have to import this module to run it,
+       which imports the model and loads every kernel from Numba's cache, so a worker is warm
+       before its first search shows up rather than paying for that in the middle of one
+    """
+    logger.debug("reachability worker %d ready", os.getpid())
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The shared pool for parallel bound searches, made on first use. Spinning up spawned
+       workers costs seconds (a fresh interpreter, scipy, numba and every cached kernel), so
+       they stick around for the next reachability_simulation instead of being torn down.
+       They get shut down when the interpreter exits
+    """
+    global _POOL
+    if _POOL is None:
+        # there's only ever an upper and a lower bound to find
+        # NOTE: spawn, not fork. Once a parallel Numba kernel has run, its worker threads
+        #       are alive and a forked child can deadlock on them. See _reach_bound for what
+        #       gets sent over instead
+        _POOL = ProcessPoolExecutor(
+            max_workers=min(2, os.cpu_count() or 1),
+            mp_context=get_context("spawn"),
+            initializer=_init_worker
+        )
+        atexit.register(_shutdown_pool)
+    return _POOL
+
+def _shutdown_pool() -> None:
+    """Stop the shared pool's workers, if there are any. The next _get_pool makes a new one"""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
+
+def _reach_bound(sim_args: tuple, order: str) -> List[HybridResult]:
+    """Find one reachability bound in a pool worker.
+       NOTE: the sim itself doesn't go over to the worker. Its model holds onto kernels, and
+             the python backend's plain functions (numba's py_func) can't be pickled by name.
+             So the worker gets plain constructor arguments and builds its own copy
+    Args:
+        sim_args (tuple): ReachabilityFlappySim constructor arguments, see _worker_args
+        order (str): dsc for the upper bound, asc for the lower one
+    Returns:
+        List[HybridResult]: all the runs to find that bound
+    """
+    sim = ReachabilityFlappySim(*sim_args)
+    return sim._reach_upper() if order == "dsc" else sim._reach_lower()
+
+class ReachabilityFlappySim(BatchSolveMixin, HybridSim[ForwardFlappyModel]):
     """Class to manage simulation runs, and an interface to Do The Thing.
     Attributes:
        t_max (float): max time for a sim run. If we get to t_max, we're successful
@@ -22,40 +83,51 @@ class ReachabilityFlappySim(HybridSim[ForwardFlappyModel]):
        start_state (FlappyState): starting state of flappy the bird
        level (FlappyLevel): level to simulate on
        seed (int): seed to use for level generation
+       backend (str): numba or python, which model kernels the sim runs
     """
     step_time: float
     level: FlappyLevel
 
-    def __init__(self, t_max: float, j_max: int, step_time: float, start_params:Dict, seed: Optional[int] = None):
+    def __init__(self, t_max: float, j_max: int, step_time: float, start_params:Dict, seed: Optional[int] = None, rng: Optional[np.random.Generator] = None, level: Optional[FlappyLevel] = None, backend: str = "numba"):
         """set up everything required for a sim run.
         Args:
             t_max (float): see class attribute of the same name
             j_max (int): see class attribute of hte same name
             step_time (float): see class attribute of the same name
             seed (Optional[int]): see class attribute of the same name
+            rng (Optional[np.random.Generator]): generator for level gen. Made from seed if not provided
+            level (Optional[FlappyLevel]): level to use instead of generating one, e.g. from
+                                           FlappyLevel.cached_procedural_gen
+            backend (str): numba for compiled model kernels, python for the plain functions
         """
         self.model = ForwardFlappyModel(
-            deepcopy(FlappyState.from_properties(**start_params)),
+            FlappyState.from_properties(**start_params),
             FlappyParams(pressed_x_vel=2.0, pressed_y_vel=2.0, gamma=9.81),
-            FlappyLevel.simple_procedural_gen(seed),
+            level if level is not None else FlappyLevel.simple_procedural_gen(seed, rng),
             t_max,
-            j_max
+            j_max,
+            backend=backend
         )
         self.t_max = t_max
         self.j_max = j_max
         self.step_time = step_time
         self.seed = seed
+        self.backend = backend
+        self._batch_solve_kernel = pick_backend(batch_solve_kernel, backend)
 
-    def single_run(self, direct_sequence: List[int]) -> HybridResult:
+    def single_run(self, direct_sequence: List[int], fixed_step: bool = False) -> HybridResult:
         """Perform a single run with the given parameters and the provided input samples
         Args:
             direct_sequence: the input samples to use for this run
+            fixed_step (bool): skip HyEQSolver and run the compiled fixed step kernel instead,
+                               see batch_solve
         Returns:
             HybridResult: the result of this simulation
         """
         input_sequence = time_sequence(direct_sequence, self.step_time)
-        # deep copy here because the model can change the state, which can
-        # bubble back to the init parameters
+        if fixed_step:
+            # a batch of one
+            return self.batch_solve([input_sequence])[0]
         self.model.input_sequence = input_sequence
         solver = HyEQSolver(self.model)
         solution = solver.solve()
@@ -65,28 +137,91 @@ class ReachabilityFlappySim(HybridSim[ForwardFlappyModel]):
         #       early (solver.stop)
         return HybridResult(not solver.stop, input_sequence, solution)
 
-    def reachability_simulation(self) -> Tuple[List[HybridResult], List[HybridResult]]:
-        """Do a reachability analysis of Flappy
+    def _worker_args(self) -> tuple:
+        """Constructor arguments for an equivalent sim, all plain picklable data. See _reach_bound
         Returns:
-            Tuple[
-                List[HybridResult]: all the runs to find the upper reachability bound
-                List[HybridResult]: all the runs to find the lower reachability bound
-            ]
+            tuple: arguments for ReachabilityFlappySim, current start state and level included
+        """
+        start_state = self.model.start_state
+        start_params = {
+            "x_pos": start_state.x_pos,
+            "y_pos": start_state.y_pos,
+            "y_vel": start_state.y_vel,
+            "pressed": start_state.pressed,
+        }
+        return (self.t_max, self.j_max, self.step_time, start_params, self.seed, None, self.model.level, self.backend)
+
+    def _reach_upper(self) -> List[HybridResult]:
+        """Find the upper reachability bound, counting down from holding the button the whole time
+        Returns:
+            List[HybridResult]: all the runs to find the upper reachability bound
+        """
+        upper_input_gen = btn_1_ordered_sequence_generator(
+            self.t_max, self.step_time, "dsc"
+        )
+        return self._find_reachability_bound_given_order(upper_input_gen)
+
+    def _reach_lower(self) -> List[HybridResult]:
+        """Find the lower reachability bound, counting up from never pressing the button
+        Returns:
+            List[HybridResult]: all the runs to find the lower reachability bound
+        """
+        lower_input_gen = btn_1_ordered_sequence_generator(
+            self.t_max, self.step_time, "asc"
+        )
+        return self._find_reachability_bound_given_order(lower_input_gen)
+
+    def iter_reachability_simulation(self) -> Iterator[HybridResult]:
+        """Same search as reachability_simulation, but hands back each run as soon as it's
+           simulated instead of holding onto all of them. Upper bound runs come first, then
+           lower bound runs
+        Yields:
+            HybridResult: the next run in the search for the upper, then lower, reachability bound
         """
         start = time.time()
-        # upper bound calc
+        num_runs = 0
         upper_input_gen = btn_1_ordered_sequence_generator(
             self.t_max, self.step_time, "dsc"
         )
-        upper_solutions = self._find_reachability_bound_given_order(upper_input_gen)
-        # lower bound calc
+        for result in self._iter_reachability_bound_given_order(upper_input_gen):
+            num_runs += 1
+            yield result
         lower_input_gen = btn_1_ordered_sequence_generator(
             self.t_max, self.step_time, "asc"
         )
-        lower_solutions = self._find_reachability_bound_given_order(lower_input_gen)
+        for result in self._iter_reachability_bound_given_order(lower_input_gen):
+            num_runs += 1
+            yield result
         print("Done!")
         stop = time.time()
-        self._print_reachability_report(start, stop, upper_solutions, lower_solutions)
-        return (upper_solutions, lower_solutions)
+        self._print_reachability_report(start, stop, num_runs)
 
-    
+    def reachability_simulation(self, parallel: bool = False) -> Tuple[List[HybridResult], List[HybridResult]]:
+        """Do a reachability analysis of Flappy
+        Args:
+            parallel (bool): find the upper and lower bound at the same time, in two worker processes.
+                             The two searches don't share anything, but their progress prints will interleave.
+                             Starting the workers costs a few seconds the first time (they're reused
+                             after that), so this only pays off when each search takes longer than that.
+                             Runs in this process anyway if there's only one CPU
+        Returns:
+            Tuple[
+                List[HybridResult]: all the runs to find the upper reachability bound
+                List[HybridResult]: all the runs to find the lower reachability bound
+            ]
+        """
+        start = time.time()
+        if parallel and (os.cpu_count() or 1) > 1:
+            pool = _get_pool()
+            sim_args = self._worker_args()
+            upper_future = pool.submit(_reach_bound, sim_args, "dsc")
+            lower_future = pool.submit(_reach_bound, sim_args, "asc")
+            upper_solutions = upper_future.result()
+            lower_solutions = lower_future.result()
+        else:
+            upper_solutions = self._reach_upper()
+            lower_solutions = self._reach_lower()
+        print("Done!")
+        stop = time.time()
+        self._print_reachability_report(start, stop, len(upper_solutions) + len(lower_solutions))
+        return (upper_solutions, lower_solutions)
@@ -2,7 +2,8 @@
    which uses them to simulate how a game will respond to certain input sequences. 
 """
 from abc import abstractmethod
-from typing import Any, Tuple, Generic, Type, TypeVar
+from typing import Any, Tuple, Generic, Type, TypeVar, Union
+from numpy import ndarray
 from .hybrid_point import HybridPoint, T
 
 G = TypeVar("G")
@@ -13,9 +14,10 @@ G = TypeVar("G")
 class HybridModel(Generic[T, G]):
     """Hybrid models need to define a bunch of things! There are 4 primary functions that
         a hybrid model must define:
-            flow (hybrid_state: HybridPoint[T]) -> T
+            flow (hybrid_state: HybridPoint[T]) -> T | ndarray
                 this function tells us how to integrate for the continuous parts of space
-                it returns d[state]/dt with respect to jumps and any other model parameters
+                it returns d[state]/dt with respect to jumps and any other model parameters.
+                A bare ndarray is fine too, and skips wrapping the derivative up as a T
             jump (hybrid_state: HybridPoint[T]) -> T
                 this function tells us how to jump, when and how to set state to new values
                 without integrating, a jump through state space. Should return new values for state,
@@ -28,6 +30,9 @@ class HybridModel(Generic[T, G]):
                 or not, 0 for no jump, 1 for jump. The bool part of the result tuple
                 is for fast failing: if bool is true, we should stop simulating
 
+        Models can also override combined_check, which answers flow_check and jump_check for the
+        same point in one call. The default just calls both
+
         A hybrid model may also define an input function (time, jumps) -> Any. This function may be called
         by flow, jump, flow_check or jump_check to see what the input at time, jumps is, which can change
         how they function
@@ -47,13 +52,14 @@ class HybridModel(Generic[T, G]):
     system_params: G
 
     @abstractmethod
-    def flow(self, hybrid_state: HybridPoint[T]) -> T:
+    def flow(self, hybrid_state: HybridPoint[T]) -> Union[T, ndarray]:
         """Flow function! This should take in y and return dy/dt.
         Args:
             hybrid_state (HybridPoint[T]): the current solve state, along with
                                            the number of jumps and the current time
         Returns:
-            T: dy/dt! The derivative of y w.r.t t given t and j and params!
+            T | ndarray: dy/dt! The derivative of y w.r.t t given t and j and params!
+                         The solver passes a bare ndarray straight through
         """
         pass
 
@@ -90,6 +96,23 @@ class HybridModel(Generic[T, G]):
         """
         pass
 
+    def combined_check(self, hybrid_state: HybridPoint[T]) -> Tuple[int, int, bool]:
+        """flow_check and jump_check at the same point, in one call. The solver's event functions
+           need both, so models whose checks share expensive work (collisions, input lookups)
+           should override this to only do that work once
+        Args:
+            hybrid_state (HybridPoint[T]): the current solve state, along with
+                                           the number of jumps and the current time
+        Returns:
+            tuple of three elements:
+                int: 1 for flowin', 0 for not flowin'
+                int: 1 for jumpin', 0 for not jumpin'
+                bool: stop signal, true if either check wants us to stop
+        """
+        should_flow, flow_stop = self.flow_check(hybrid_state)
+        should_jump, jump_stop = self.jump_check(hybrid_state)
+        return (should_flow, should_jump, flow_stop or jump_stop)
+
     def get_input(self, time: float, jumps: int) -> Any:
         """Function to get input to use in the flow, jump, flow_check or jump_check
             functions. Unlike the above functions, you don't have to use this (some
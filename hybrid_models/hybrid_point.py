@@ -3,7 +3,7 @@
 """
 
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from typing import Generic, List, TypeVar
 from collections.abc import Sequence
 from .ndarray_dataclass import NDArrayBacked
 
@@ -28,3 +28,22 @@ class HybridPoint(Generic[T]):
         return (self.time, self.state.to_simple(), self.jumps)
     def __str__(self):
         return f"{self.time:0.4f}\t{self.state}\t{self.jumps}"
+
+
+def reverse_time_and_jumps(solution: List[HybridPoint]) -> None:
+    """Backwards-in-time models solve "forward", so their solutions come out in the right order
+       but with time and jumps counted from the wrong end. Remap them in place.
+       The solver only ever moves forward in time and jumps, so the last point holds both
+       maximums-- no need to scan for them (or to abs the differences, they can't go negative)
+       NOTE: one plain pass on purpose. Pulling times and jumps out into numpy arrays and writing
+             them back costs 3-6x more than this, at every solution length we've timed
+    Args:
+        solution (List[HybridPoint]): solver output to remap
+    """
+    if not solution:
+        return
+    max_solve_time = solution[-1].time
+    max_solve_jumps = solution[-1].jumps
+    for point in solution:
+        point.time = max_solve_time - point.time
+        point.jumps = max_solve_jumps - point.jumps
@@ -5,8 +5,9 @@ from .ndarray_dataclass import NDArrayBacked
 from input.input_signal import InputSignal
 
 from collections import defaultdict
-from typing import List, Sequence, Any, Callable, Tuple, cast, Optional
+from typing import List, Sequence, Any, Callable, Iterable, Tuple, cast, Optional
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from matplotlib.axes import Axes
@@ -20,16 +21,20 @@ class HybridResultPlotter:
         optional_data (Any): optional data to plot along with the sequence of hybrid results
         _color_map (Unknown): the matplotlib colormap to use when coloring jumps
     """
-    data: Sequence[HybridResult]
+    data: List[HybridResult]
     optional_data: Any
     init_config: Optional[NDArrayBacked]
     _color_map = mpl.colormaps["plasma"] #type: ignore this works actually
     
     def __init__(self, data_to_plot:Sequence[HybridResult], optional_data:Any=None, init_config:Optional[NDArrayBacked]=None):
-        self.data = data_to_plot
+        self.data = list(data_to_plot)
         self.optional_data = optional_data
         self.init_config = init_config
 
+    def extend(self, more_data:Iterable[HybridResult]):
+        """Add more results to plot, for when they show up a few at a time while a sim is running"""
+        self.data.extend(more_data)
+
     def plot_state_over_time(self, state_labels:List[str], chart_label:str):
         """Take the provided data, and plot every single dimension
            of state over time. Color based on jumps.
@@ -50,11 +55,14 @@ class HybridResultPlotter:
         
         solution_by_jumps, plt_color_indices = self._organize_by_jumps(solution_to_plot, lambda point: point.time)
 
+        # every axis plots the same slices, so stack each slice's states once up front
+        slice_data = {
+            jump: ([float(point.time) for point in slice], self._state_columns(slice, range(state_dim)))
+            for jump, slice in solution_by_jumps.items()
+        }
         for idx, ax in enumerate(fig.axes):
-            for jump, slice in solution_by_jumps.items():
-                x_data = [float(point.time) for point in slice]
-                y_data = [float(point.state[idx]) for point in slice]
-                ax.plot(x_data, y_data, color=self._color_map.colors[plt_color_indices[jump]], label=f"Jump {jump}")
+            for jump, (x_data, columns) in slice_data.items():
+                ax.plot(x_data, columns[idx], color=self._color_map.colors[plt_color_indices[jump]], label=f"Jump {jump}")
             
             # just for one graph. trying to figure out legend placement is ruining me
             if(idx == 0):
@@ -78,12 +86,15 @@ class HybridResultPlotter:
         
         solution_by_jumps, plt_color_indices = self._organize_by_jumps(solution_to_plot, lambda point: point.time)
 
+        # every state axis plots the same slices, so stack each slice's states once up front
+        slice_data = {
+            jump: ([float(point.time) for point in slice], self._state_columns(slice, range(state_dim - 1)))
+            for jump, slice in solution_by_jumps.items()
+        }
         for idx, ax in enumerate(fig.axes):
             if idx < len(solution_to_plot[0].state):
-                for jump, slice in solution_by_jumps.items():
-                    x_data = [float(point.time) for point in slice]
-                    y_data = [float(point.state[idx]) for point in slice]
-                    ax.plot(x_data, y_data, color=self._color_map.colors[plt_color_indices[jump]], label=f"Jump {jump}")
+                for jump, (x_data, columns) in slice_data.items():
+                    ax.plot(x_data, columns[idx], color=self._color_map.colors[plt_color_indices[jump]], label=f"Jump {jump}")
                 # just for one graph. trying to figure out legend placement is ruining me
                 if(idx == 0):
                     ax.legend()
@@ -114,9 +125,7 @@ class HybridResultPlotter:
         # .   but we don't really have a data channel for that
         # trace colors?
         for sol_idx, solution in enumerate(self.data):
-            data_to_plot = solution.sim_result
-            x_data = [float(point.state[x_dim_idx]) for point in data_to_plot]
-            y_data = [float(point.state[y_dim_idx]) for point in data_to_plot]
+            x_data, y_data = self._state_columns(solution.sim_result, (x_dim_idx, y_dim_idx))
             if solution.successful:
                 ax.plot(x_data, y_data, "-", color="blue", label="possible")
             else:
@@ -165,8 +174,7 @@ class HybridResultPlotter:
 
             data_by_jumps, jump_color_map = self._organize_by_jumps(data_to_plot, lambda point: point.state[x_dim_idx])
             for jump, slice in data_by_jumps.items():
-                x_data = [float(point.state[x_dim_idx]) for point in slice]
-                y_data = [float(point.state[y_dim_idx]) for point in slice]
+                x_data, y_data = self._state_columns(slice, (x_dim_idx, y_dim_idx))
                 ax.plot(x_data, y_data, color=self._color_map.colors[jump_color_map[jump]], label=f"Jump {jump}")
 
         ax = self._plot_init(ax, x_dim_idx, y_dim_idx)
@@ -213,9 +221,7 @@ class HybridResultPlotter:
             ax (Axes): the axes with the run graphed on them
         """
         run = self.data[run_idx]
-        output = run.sim_result
-        x_data = [point.state[x_dim_idx] for point in output]
-        y_data = [point.state[y_dim_idx] for point in output]
+        x_data, y_data = self._state_columns(run.sim_result, (x_dim_idx, y_dim_idx))
         #print(x_data)
         #print(y_data)
         if run.successful:
@@ -264,6 +270,21 @@ class HybridResultPlotter:
             for x in range(num_samples)
         ]
     
+    @classmethod
+    def _state_columns(cls, hybrid_points:Sequence[HybridPoint], dims:Iterable[int]) -> List[np.ndarray]:
+        """Stack every point's state into one array and slice out whole columns, instead of
+           indexing into each state one at a time
+        Args:
+            hybrid_points (Sequence[HybridPoint]): the hybrid points to pull state from
+            dims (Iterable[int]): which dimensions of state to return
+        Returns:
+            List[np.ndarray]: one array per dim, with a value per point
+        """
+        if not hybrid_points:
+            return [np.empty(0) for _ in dims]
+        states = np.array([point.state.to_array() for point in hybrid_points], dtype=float)
+        return [states[:, dim] for dim in dims]
+
     @classmethod
     def _organize_by_jumps(cls, hybrid_points:Sequence[HybridPoint], sort_by:Callable) -> Tuple[defaultdict, List]:
         """Given a sequence of hybrid points, organize them by jump such that
@@ -280,11 +301,12 @@ class HybridResultPlotter:
         data_by_jumps = defaultdict(list)
         for point in hybrid_points:
             data_by_jumps[point.jumps].append(point)
-        for num_jumps, points in data_by_jumps.items():
-            data_by_jumps[num_jumps] = sorted(points, key=sort_by) 
+        for points in data_by_jumps.values():
+            # these lists are ours, sort them where they are
+            points.sort(key=sort_by)
     
         color_idxs = cls._evenly_divide(
-            max([n_jumps for n_jumps in data_by_jumps.keys()]) + 1, 0, len(cls._color_map.colors)
+            max(data_by_jumps) + 1, 0, len(cls._color_map.colors)
         )
         return data_by_jumps, color_idxs
     
@@ -2,9 +2,9 @@
     Contains some common search functions (find bounds given ordered input)
 """
 
-from copy import deepcopy
+import logging
 import time
-from typing import Generator, Optional, List, Generic, TypeVar
+from typing import Generator, Iterator, Optional, List, Generic, TypeVar
 
 from hybrid_models.hybrid_solver import HyEQSolver
 from .hybrid_model import HybridModel, T, G
@@ -12,6 +12,8 @@ from .hybrid_result import HybridResult
 from .hybrid_point import HybridPoint
 
 from input.input_signal import InputSignal
+logger = logging.getLogger(__name__)
+
 L = TypeVar("L") # level type var
 M = TypeVar("M", bound=HybridModel) # model type var
 
@@ -49,6 +51,18 @@ class HybridSim(Generic[M]):
         self,
         input_generator: Generator[InputSignal, Optional[List], None]
     ) -> List[HybridResult]:
+        """Same as _iter_reachability_bound_given_order, but collects every run into a list
+        Args:
+            input_generator (Generator[InputSignal, Optional[List], None]): see _iter_reachability_bound_given_order
+        Returns:
+            List[HybridResult]: all the runs it took to find the bound (or a massive list of failed runs if none could be found)
+        """
+        return list(self._iter_reachability_bound_given_order(input_generator))
+
+    def _iter_reachability_bound_given_order(
+        self,
+        input_generator: Generator[InputSignal, Optional[List], None]
+    ) -> Iterator[HybridResult]:
         """Function to find an upper or lower reachability bound, given an ordered input.
             Because flappy only has one button, we can order the input by how often that button is held down
             the "max" is the button being held down at all times (all 1s), the min is the button never being
@@ -57,17 +71,18 @@ class HybridSim(Generic[M]):
         Args:
             input_generator (Generator[InputSignal, Optional[List], None]): a generator that returns input in an
                increasing or decreasing order. The generator can also skip input, based on how far we've gotten.
-        Returns:
-            List[HybridResult]: all the runs it took to find the bound (or a massive list of failed runs if none could be found)
+        Yields:
+            HybridResult: each run it takes to find the bound, as soon as it's simulated (or a whole lot of
+                          failed runs if none could be found)
         """
-        solutions: List[HybridResult] = []
+        last_solution: Optional[HybridResult] = None
         done = False
         input_sequence = None
         # this algorithm only makes sense for models with an input sequence
         if not hasattr(self.model, 'input_sequence'):
             raise RuntimeError("Provided model does not have an input sequence")
-        # deep copy here because the model can change the state, which can
-        # bubble back to the init object
+        # one solver for every run, reset between them
+        solver = HyEQSolver(self.model)
         while not done:
             # get an input sequence if we haven't gotten one yet
             single_run_start = time.time()
@@ -75,27 +90,27 @@ class HybridSim(Generic[M]):
                 input_sequence = input_generator.send(
                     None
                 )  # explicit about getting the first element from the generator
-            self.model.input_sequence = input_sequence #type: ignore models that make it this far have input sequences
-            print(
-                f"Simulating: {''.join([str(sample) for sample in self.model.input_sequence.samples])}" #type: ignore models that make it this far have input sequences
-            )
-            print(
-                f"Start State: {self.model.start_state}"
-            )
-            solver = HyEQSolver(self.model)
+            solver.reset(input_sequence)
+            if logger.isEnabledFor(logging.DEBUG):
+                # joining the samples isn't free, skip it when nobody's listening
+                logger.debug(
+                    "Simulating: %s", "".join([str(sample) for sample in self.model.input_sequence.samples]) #type: ignore models that make it this far have input sequences
+                )
+            logger.debug("Start State: %s", self.model.start_state)
             solution = solver.solve()
             solve_stop_time = time.time()
             if not solution:
-                print("Got a completely blank solution from the solver")
-                print("May mean an invalid start state?")
+                logger.debug("Got a completely blank solution from the solver. May mean an invalid start state?")
                 # solution is the empty array. I think this means that we shouldn't
                 # even try other input sequences?
                 done = True
                 # the solution is just a single failed point at the start state
-                solutions.append(HybridResult(False, input_sequence, [HybridPoint(0.0, self.model.start_state, 0)]))
+                last_solution = HybridResult(False, input_sequence, [HybridPoint(0.0, self.model.start_state, 0)])
+                yield last_solution
             elif solver.stop == True:
                 # normal failed run path
-                solutions.append(HybridResult(False, input_sequence, solution))
+                last_solution = HybridResult(False, input_sequence, solution)
+                yield last_solution
                 # find the index of the last relevant input sample
                 last_sim_time = solution[-1].time
                 relevant_input = [
@@ -110,33 +125,28 @@ class HybridSim(Generic[M]):
                     #       any new sequence that is the same as a partial sequence that we know fails, also fails,
                     #       and does not need to be simulated
                     input_sequence = input_generator.send(relevant_input)
-                    skip_stop_time = time.time()
                 except StopIteration:
                     # We're in a state where we can't actually keep going-- we're invalid, there's
                     # no input sequence that we can take to get out of this one
                     done = True
             elif solver.stop == False:
                 # This is the upper bound
-                solutions.append(HybridResult(True, input_sequence, solution))
+                last_solution = HybridResult(True, input_sequence, solution)
+                yield last_solution
                 done = True
             skip_stop_time = time.time()
             if not done:
-                print(
-                    f"Time spent solving: {solve_stop_time - single_run_start:0.02f}s"
-                )
-                print(f"Time spent skipping: {skip_stop_time - solve_stop_time:0.02f}s")
-        if solutions and solutions[-1].successful == True:
-            print("...Valid solution found!")
-            print(f"{solutions[-1].input_sequence.samples}")  # type:ignore
-        return solutions
+                logger.debug("Time spent solving: %0.02fs", solve_stop_time - single_run_start)
+                logger.debug("Time spent skipping: %0.02fs", skip_stop_time - solve_stop_time)
+        if last_solution is not None and last_solution.successful == True:
+            logger.debug("...Valid solution found!")
+            logger.debug("%s", last_solution.input_sequence.samples)  # type:ignore
 
-    def _print_reachability_report(
-        self, start: float, stop: float, upper_solutions: List, lower_solutions: List
-    ) -> None:
+    def _print_reachability_report(self, start: float, stop: float, num_runs: int) -> None:
         """Print out a block of info about how long the reachability calculations took"""
         print(f"Finished {self.t_max}s of game play in {stop - start:0.02f}s")
-        print(f"Took {len(upper_solutions) + len(lower_solutions)} runs")
+        print(f"Took {num_runs} runs")
         print(
-            f"... per run time: {(stop - start) / (len(upper_solutions) + len(lower_solutions)):0.02f}"
+            f"... per run time: {(stop - start) / num_runs:0.02f}"
         )
-        print(f"Level Seed: {self.seed}")
\ No newline at end of file
+        print(f"Level Seed: {self.seed}")
@@ -1,17 +1,16 @@
 """Core class for solving a hybrid systems equation!
     FIXME: move notes from notebook to here
 """
-from typing import Callable, List, Generic, Sequence, Dict, Any, Tuple
+from typing import Callable, List, Generic, Sequence, Dict, Any, Tuple, Optional
+import numpy as np
 import scipy.integrate as integrate
 from .hybrid_model import HybridModel
 from .hybrid_point import HybridPoint, T
 from input.input_signal import InputSignal
-from copy import deepcopy
-from pprint import pprint
 
-from logging import Logger
+import logging
 
-logger = Logger(__file__)
+logger = logging.getLogger(__name__)
 
 class HyEQSolver(Generic[T]):
     """A python implementation of a hybrid equation solver!
@@ -61,7 +60,7 @@ class HyEQSolver(Generic[T]):
         # FIXME: the solver messes with cur_state, which can eventually bubble back
         # .      to the model start state with a weak reference
         #        I don't love this copy op
-        self.cur_state = HybridPoint(0.0, deepcopy(self.model.start_state), 0)
+        self.cur_state = HybridPoint(0.0, self.model.start_state.clone(), 0)
         self.stop = False
 
         # solver event functions
@@ -70,6 +69,25 @@ class HyEQSolver(Generic[T]):
         # and initialize where solutions will live
         self.sol = []
 
+    def reset(self, input_sequence: Optional[InputSignal] = None, model: Optional[HybridModel] = None) -> None:
+        """Get ready for another solve() without building a new solver. Picks up the model's
+           current start state, and a new input sequence if one's provided
+        Args:
+            input_sequence (Optional[InputSignal]): input to give the model before solving. Leave it
+                                                    out to keep whatever the model already has
+            model (Optional[HybridModel]): model to solve over from now on. Leave it out to keep
+                                           the current one. Event functions look the model up on
+                                           every call, so they don't need rebuilding
+        """
+        if model is not None:
+            self.model = model
+        if input_sequence is not None:
+            self.model.input_sequence = input_sequence  # type: ignore models that get input have this
+        self.cur_state = HybridPoint(0.0, self.model.start_state.clone(), 0)
+        self.stop = False
+        # NOTE: a new list, not .clear(). Whoever got the last solution is still holding onto it
+        self.sol = []
+
     def _create_event_functs(self, rule) -> List[Callable]:
         """Zero crossing functions!
         Very not sure why these work, but they do maybe!
@@ -89,11 +107,9 @@ class HyEQSolver(Generic[T]):
         def inside_jump(t, state_values):
             model_state = self.model.state_factory(state_values)
             hybrid_point_from_solver = HybridPoint(t, model_state, self.cur_state.jumps)
-            return (
-                2
-                - self.model.flow_check(hybrid_point_from_solver)[0]
-                - self.model.jump_check(hybrid_point_from_solver)[0]
-            )
+            # both checks at the same point, so let the model share work between them
+            should_flow, should_jump, _ = self.model.combined_check(hybrid_point_from_solver)
+            return 2 - should_flow - should_jump
 
         def outside_flow(t, state_values):
             model_state = self.model.state_factory(state_values)
@@ -118,7 +134,7 @@ class HyEQSolver(Generic[T]):
 
         return functs
 
-    def _flow_wrapper(self, t: float, x: Sequence) -> List:
+    def _flow_wrapper(self, t: float, x: Sequence) -> np.ndarray:
         """This is what the underlying solver is gonna call to get dy/dt
            values. As we're using somewhat more complicated types, I
            wrap that call so we can go to and from our types
@@ -127,7 +143,10 @@ class HyEQSolver(Generic[T]):
             t, self.model.state_factory(x), self.cur_state.jumps
         )
         result = self.model.flow(hybrid_point_from_solver)
-        return result._data # avoid an unwrapping operation here-- the solver just wants the ndarray
+        # models are allowed to hand back a bare ndarray, which is all the solver wants anyway
+        if isinstance(result, np.ndarray):
+            return result
+        return result.to_array()
 
     def jump(self) -> None:
         """Perform a model jump! Call jump with the appropriate arguments"""
@@ -157,7 +176,7 @@ class HyEQSolver(Generic[T]):
                 ode_sol = integrate.solve_ivp(
                     self._flow_wrapper,
                     (self.cur_state.time, self.model.t_max),
-                    self.cur_state.state._data,
+                    self.cur_state.state.to_array(),
                     events=self.zero_events,
                     max_step=self.max_step,
                     atol=self.atol,
@@ -167,7 +186,7 @@ class HyEQSolver(Generic[T]):
                 # a little error handling, as a treat
                 # also fast fail, something's weird and up
                 if ode_sol.status == -1:
-                    logger.error(f"Solver Failed! Message: {ode_sol.message}")
+                    logger.error("Solver Failed! Message: %s", ode_sol.message)
                     return self.sol
                 short_term_memory = []
                 for time, state_values in zip(ode_sol.t, ode_sol.y.T):
@@ -180,8 +199,12 @@ class HyEQSolver(Generic[T]):
                 #        but the current state may get mutated by jumps
                 #        and this lets us hold onto both sides of the instantaneous change
                 #        (self.sol[-1] is pre change and self.cur_state will become post change)
-                self.memory[(self.cur_state.to_simple(), self.model.input_sequence.to_simple())] = tuple(value for value in short_term_memory)
-                self.cur_state = deepcopy(self.sol[-1])
+                # not every model takes input (bouncing balls don't)
+                input_sequence = getattr(self.model, "input_sequence", None)
+                simple_input = input_sequence.to_simple() if input_sequence is not None else None
+                self.memory[(self.cur_state.to_simple(), simple_input)] = tuple(value for value in short_term_memory)
+                last_point = self.sol[-1]
+                self.cur_state = HybridPoint(last_point.time, last_point.state.clone(), last_point.jumps)
 
             # check stop signal
             if self.stop:
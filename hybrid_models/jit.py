@@ -0,0 +1,40 @@
+"""Optional Numba support! Models can decorate their arithmetic kernels with njit from here.
+   If Numba isn't installed, njit hands the plain Python function back, so everything
+   still runs, just slower. Setting HYEQ_JIT=python before any kernel module gets imported
+   does the same thing with Numba installed, so nothing compiles at all.
+"""
+import os
+from typing import Callable
+
+# what pick_backend understands: numba runs kernels compiled, python runs the plain functions
+BACKENDS = ("numba", "python")
+
+try:
+    # NOTE: kernels with signatures compile as soon as their module is imported, so this has
+    #       to be decided before then. pick_backend can't help with that
+    if os.environ.get("HYEQ_JIT") == "python":
+        raise ImportError("Numba turned off with HYEQ_JIT=python")
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs) -> Callable:
+        """Stand-in for numba.njit. Works both bare (@njit) and with arguments (@njit(cache=True))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+def pick_backend(kernel: Callable, backend: str = "numba") -> Callable:
+    """Hand back kernel as-is for the numba backend, or the plain Python function under it for the
+       python backend. Handy for A/B timing. Doesn't skip compiling: kernels with signatures
+       already compiled (or loaded from Numba's cache) when their module got imported. Set
+       HYEQ_JIT=python for that
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}! Pick one of {BACKENDS}")
+    if backend == "python":
+        # without numba, njit already handed back the plain function, which has no py_func
+        return getattr(kernel, "py_func", kernel)
+    return kernel
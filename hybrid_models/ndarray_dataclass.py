@@ -1,7 +1,7 @@
 """Define a simple abstraction layer over a list so that we can interface with
     numpy-based abstractions a little easier
 """
-from typing import List, Generic, TypeVar
+from typing import List, Generic, TypeVar, Iterator
 from collections.abc import Sequence
 from functools import singledispatch
 from numpy import ndarray, array
@@ -11,7 +11,11 @@ from typing import Type
 
 T = TypeVar("T")
 
-class NDArrayBacked(Sequence, Generic[T]):
+# NOTE: not subclassing Sequence on purpose. Its ABC machinery and mixins cost us on every
+#       state the solver builds, and we define everything callers actually use ourselves.
+#       Registered as a virtual subclass down below, so isinstance checks still work
+class NDArrayBacked(Generic[T]):
+    __slots__ = ("_data",)
     _data:ndarray
 
     def __init__(self, data:ArrayLike):
@@ -23,6 +27,11 @@ class NDArrayBacked(Sequence, Generic[T]):
     def __getitem__(self, key:int) -> T:
         return self._data[key]
 
+    def __iter__(self) -> Iterator[T]:
+        # Sequence's default __iter__ calls __getitem__ until it hits an IndexError,
+        # just hand back the array's iterator
+        return iter(self._data)
+
     def __str__(self) -> str:
         return "\t".join([f"{elem:0.04f}" for elem in self._data])
 
@@ -31,5 +40,24 @@ class NDArrayBacked(Sequence, Generic[T]):
     def from_properties(cls):
         pass
 
+    def clone(self):
+        """A fresh copy of this state. Much cheaper than deepcopy, which doesn't know
+           all we hold is one flat array. Skips __init__ too: _data is already the right
+           shape and dtype, it just needs copying"""
+        cloned = object.__new__(type(self))
+        cloned._data = self._data.copy()
+        return cloned
+
+    def to_array(self) -> ndarray:
+        """The backing ndarray itself, no copy. For handing state to numpy / scipy"""
+        return self._data
+
+    def to_list(self) -> list:
+        """Every field as plain Python values, in one go. For hot paths that want several
+           fields at once, it's cheaper than a property call and an ndarray index per field"""
+        return self._data.tolist()
+
     def to_simple(self) -> tuple:
-        return tuple(value for value in self._data)
\ No newline at end of file
+        return tuple(self._data.tolist())
+
+Sequence.register(NDArrayBacked)
@@ -2,6 +2,7 @@
    They almost always yield InputSignals of various kinds.
 """
 from typing import Generator, List, Optional
+import numpy as np
 from .input_signal import InputSignal
 import logging
 
@@ -115,7 +116,7 @@ def btn_1_bounded_sequence_generator(upper_bound:InputSignal, lower_bound:InputS
     safe_num_results = num_results if num_results else (upper_bound_as_int - lower_bound_as_int)
     safe_num_results = safe_num_results if safe_num_results <= (upper_bound_as_int - lower_bound_as_int) else (upper_bound_as_int - lower_bound_as_int)
     stride = (upper_bound_as_int - lower_bound_as_int) // safe_num_results
-    print(f"... gives us a stride of {stride}")
+    logger.debug("... gives us a stride of %d", stride)
     for next_value in range(upper_bound_as_int, lower_bound_as_int, -stride):
         bin_list = _int_to_bin_list(next_value, n_samples)
         #print(f"Yielding: {bin_list}")
@@ -124,6 +125,35 @@ def btn_1_bounded_sequence_generator(upper_bound:InputSignal, lower_bound:InputS
     # but it's more complicated to get precise here and we don't need to be
     yield InputSignal(_int_to_bin_list(lower_bound_as_int, n_samples), upper_bound.times)
 
+def btn_1_bounded_sequence_array(upper_bound:InputSignal, lower_bound:InputSignal, num_results:Optional[int]=None) -> np.ndarray:
+    """ Every sequence btn_1_bounded_sequence_generator would yield, in the same order, as the rows
+        of one array. For callers that want the whole stride at once anyway (batched solves), this
+        skips building an InputSignal per sequence and all the int -> string -> list round trips
+    Args:
+        upper_bound (InputSignal): see btn_1_bounded_sequence_generator
+        lower_bound (InputSignal): see btn_1_bounded_sequence_generator
+        num_results (int [optional]): see btn_1_bounded_sequence_generator
+    Returns:
+        np.ndarray: (n_sequences, n_samples) int8 array of button values, one row per sequence
+    """
+    n_samples = len(upper_bound.samples)
+    if n_samples > 62:
+        # sequence values won't fit in an int64 anymore, go the slow way
+        return np.array(
+            [sequence.samples for sequence in btn_1_bounded_sequence_generator(upper_bound, lower_bound, num_results)],
+            dtype=np.int8
+        ).reshape(-1, n_samples)
+    # same divisor math as btn_1_bounded_sequence_generator
+    upper_bound_as_int = int(f"0b{''.join([str(digit) for digit in upper_bound.samples])}", 2)
+    lower_bound_as_int = int(f"0b{''.join([str(digit) for digit in lower_bound.samples])}", 2)
+    safe_num_results = num_results if num_results else (upper_bound_as_int - lower_bound_as_int)
+    safe_num_results = safe_num_results if safe_num_results <= (upper_bound_as_int - lower_bound_as_int) else (upper_bound_as_int - lower_bound_as_int)
+    stride = (upper_bound_as_int - lower_bound_as_int) // safe_num_results
+    values = np.append(np.arange(upper_bound_as_int, lower_bound_as_int, -stride, dtype=np.int64), lower_bound_as_int)
+    # most significant bit first, same as _int_to_bin_list
+    shifts = np.arange(n_samples - 1, -1, -1, dtype=np.int64)
+    return ((values[:, np.newaxis] >> shifts) & 1).astype(np.int8)
+
 def time_sequence(input_samples, step_time) -> InputSignal:
     """if we already have a sequence and a step time, allocate samples to
     times, return a signal
@@ -0,0 +1,42 @@
+""" reachability_simulation(parallel=True) against the in-process search. CI boxes (and dev
+    containers) often only have the one CPU, where parallel quietly runs in process, so
+    these pretend there are more to make sure the pool path itself gets run
+"""
+import contextlib
+import io
+import unittest
+from unittest import mock
+from flappy.reachability import flappy_simulation
+from flappy.reachability.flappy_simulation import ReachabilityFlappySim
+
+
+def _samples(results):
+    """Just the input samples of each run, which is enough to tell two searches apart"""
+    return [list(result.input_sequence.samples) for result in results]
+
+
+class ParallelReachabilityTest(unittest.TestCase):
+
+    def tearDown(self):
+        flappy_simulation._shutdown_pool()
+
+    def _check_backend(self, backend: str):
+        sim = ReachabilityFlappySim(0.7, 20, 0.1, {"x_pos": 0.1, "y_pos": 2.0, "y_vel": 0.0, "pressed": 0}, 3, backend=backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            upper, lower = sim.reachability_simulation()
+            with mock.patch("os.cpu_count", return_value=4):
+                parallel_upper, parallel_lower = sim.reachability_simulation(parallel=True)
+        self.assertEqual(flappy_simulation._POOL._max_workers, 2)
+        self.assertEqual(_samples(upper), _samples(parallel_upper))
+        self.assertEqual(_samples(lower), _samples(parallel_lower))
+
+    def test_numba_backend(self):
+        self._check_backend("numba")
+
+    def test_python_backend(self):
+        # the model's kernels are numba's py_funcs here, which can't be pickled
+        self._check_backend("python")
+
+
+if __name__ == "__main__":
+    unittest.main()